@@ -12,6 +12,29 @@ class AIClient:
     def __init__(self, api_key: str) -> None:
         self.api_key: str = api_key
         self.base_url: str = "https://api.deepseek.com/v1"
+        self._client: Optional[httpx.AsyncClient] = None
+        # 请求头在初始化时一次性构建，不在每次请求时重复拼接
+        self._headers: Dict[str, str] = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取复用的HTTP客户端（保持长连接，避免每次请求重新握手）"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self._headers,
+                timeout=60.0,
+                limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """关闭HTTP客户端"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def get_confidence_score(self, data: Dict[str, str]) -> float:
         """
@@ -33,32 +56,27 @@ class AIClient:
 """
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "deepseek-chat",
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.1,
-                        "response_format": {"type": "json_object"}
-                    },
-                    timeout=60.0
-                )
-                response.raise_for_status()
-                result = response.json()
-                content = result["choices"][0]["message"]["content"]
-                
-                logger.info(f"AI 原始置信度返回内容: {content}")
-                
-                parsed_result = json.loads(content)
-                confidence = float(parsed_result.get("confidence", 0.5))
-                
-                # 确保置信度在0-1之间
-                return min(max(confidence, 0.0), 1.0)
+            client = self._get_client()
+            response = await client.post(
+                "/chat/completions",
+                json={
+                    "model": "deepseek-chat",
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": 0.1,
+                    "response_format": {"type": "json_object"}
+                }
+            )
+            response.raise_for_status()
+            result = response.json()
+            content = result["choices"][0]["message"]["content"]
+            
+            logger.info(f"AI 原始置信度返回内容: {content}")
+            
+            parsed_result = json.loads(content)
+            confidence = float(parsed_result.get("confidence", 0.5))
+            
+            # 确保置信度在0-1之间
+            return min(max(confidence, 0.0), 1.0)
 
         except Exception as e:
             logger.error(f"AI置信度分析失败: {e}", exc_info=True)
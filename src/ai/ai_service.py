@@ -2,6 +2,7 @@ import logging
 import asyncio
 from datetime import datetime
 from typing import Optional, Dict, Any
+import httpx
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from src.config import CONFIG
 from src.database import set_config, get_config # 假设 get_config 存在
@@ -22,6 +23,11 @@ class AIService:
         self.report_generator: ReportGenerator = ReportGenerator(CONFIG.deepseek_api_key)
         self.black_swan_radar: BlackSwanRadar = BlackSwanRadar(CONFIG.deepseek_api_key)
         self.scheduler: AsyncIOScheduler = AsyncIOScheduler(timezone="UTC")
+        # 复用同一个HTTP客户端发送 Webhook，避免每条消息都重新建立 TLS 连接
+        self._http_client: httpx.AsyncClient = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+        )
     
     async def send_discord_webhook(self, webhook_url: str, content: str, title: str, color: int) -> None:
         """(此方法保持不变)"""
@@ -30,19 +36,17 @@ class AIService:
             return
         
         try:
-            import httpx
-            async with httpx.AsyncClient() as client:
-                payload = {
-                    "embeds": [{
-                        "title": title,
-                        "description": content,
-                        "color": color,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }]
-                }
-                response = await client.post(webhook_url, json=payload, timeout=10.0)
-                response.raise_for_status()
-                logger.info(f"成功发送消息到Discord: {title}")
+            payload = {
+                "embeds": [{
+                    "title": title,
+                    "description": content,
+                    "color": color,
+                    "timestamp": datetime.utcnow().isoformat()
+                }]
+            }
+            response = await self._http_client.post(webhook_url, json=payload)
+            response.raise_for_status()
+            logger.info(f"成功发送消息到Discord: {title}")
         except Exception as e:
             logger.error(f"发送Discord消息失败: {e}", exc_info=True)
     
@@ -155,6 +159,9 @@ class AIService:
     async def stop(self) -> None:
         """(此方法保持不变)"""
         self.scheduler.shutdown()
+        await self._http_client.aclose()
+        await self.macro_analyzer.ai_client.close()
+        await self.report_generator.ai_client.close()
         logger.info("AI参谋部已关闭")
 
 # 全局服务实例 (无变动)
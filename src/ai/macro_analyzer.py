@@ -90,7 +90,7 @@ class MacroAnalyzer:
         self.last_known_season = current_season
         # await set_setting("market_season", current_season)
         
-        logger.info(f"最终评分: {final_score:.2f}, AI置信度: {ai_confidence:.2f}, 判定状态: {current_season}")
+        logger.info("最终评分: %.2f, AI置信度: %.2f, 判定状态: %s", final_score, ai_confidence, current_season)
         
         # 6. 返回最终决策包
         return {
@@ -75,7 +75,7 @@ class AlertSystem:
         
         # 检查冷却时间
         if not self._check_cooldown(alert_type, level):
-            logger.debug(f"报警 {alert_type} 在冷却期内，跳过")
+            logger.debug("报警 %s 在冷却期内，跳过", alert_type)
             return
         
         # 创建报警记录
@@ -173,7 +173,8 @@ class AlertSystem:
             'HIGH_SLIPPAGE': '⚠️ 高滑点',
             'EXCHANGE_ERROR': '🔴 交易所错误',
             'STRATEGY_ERROR': '🚨 策略错误',
-            'LIQUIDATION': '⚠️ 清仓指令'
+            'LIQUIDATION': '⚠️ 清仓指令',
+            'DATABASE_ERROR': '🔴 数据库错误'
         }
         return titles.get(alert_type, '⚠️ 系统报警')
     
@@ -187,7 +188,8 @@ class AlertSystem:
             'HIGH_SLIPPAGE': '① 检查流动性 ② 调整滑点容忍度',
             'EXCHANGE_ERROR': '① 检查VPN ② 切换备用交易所',
             'STRATEGY_ERROR': '① 暂停策略 ② 检查参数',
-            'LIQUIDATION': '① 确认清仓原因 ② 评估市场风险'
+            'LIQUIDATION': '① 确认清仓原因 ② 评估市场风险',
+            'DATABASE_ERROR': '① 检查磁盘空间与数据库锁 ② 核对信号数据'
         }
         return suggestions.get(alert_type, '请检查系统状态')
     
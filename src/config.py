@@ -28,6 +28,7 @@ class Settings(BaseSettings):
     alert_cooldown_period: int = Field(default=300, env="ALERT_COOLDOWN_PERIOD")
 
     trading_engine: bool = Field(default=True, env="TRADING_ENGINE")
+    quote_currency: str = Field(default="USDT", env="QUOTE_CURRENCY")
 
     # --- 【核心修改】恢复 macro_cache_timeout 配置项 ---
     macro_cache_timeout: int = Field(default=300, env="MACRO_CACHE_TIMEOUT")
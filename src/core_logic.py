@@ -1,9 +1,11 @@
 import logging
-from typing import Dict, Set, Optional, Any
+import functools
+from typing import Dict, Set, Optional, Any, TYPE_CHECKING
 import re
-# --- 【新增】导入我们需要的pandas和numpy库 ---
-import pandas as pd
-import numpy as np
+
+if TYPE_CHECKING:
+    # pandas 仅用于类型注解，运行时由调用方传入 Series，无需在导入时加载
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -32,15 +34,16 @@ BEST_OSC_THRESHOLD = 0.10
 LEVERAGE_MAP = {"BULL": 3.0, "OSC": 1.0, "BEAR": 2.0}
 
 def get_unified_decision(
-    factor_data: pd.Series, # 一个包含当天所有因子值的Pandas Series
-    eth_daily_returns: pd.Series # ETH的日收益率序列，用于模拟AI置信度
+    factor_data: "pd.Series", # 一个包含当天所有因子值的Pandas Series
+    eth_daily_returns: "pd.Series" # ETH的日收益率序列，用于模拟AI置信度
 ) -> Dict[str, Any]:
     """
     这是新的核心决策函数。
     它接收所有量化因子，并计算出最终的宏观决策。
     """
     # 1. 模拟AI置信度
-    ai_confidence = 1 - (eth_daily_returns.rolling(20).std() / eth_daily_returns.rolling(20).std().max())
+    rolling_std = eth_daily_returns.rolling(20).std()  # 只计算一次滚动标准差
+    ai_confidence = 1 - (rolling_std / rolling_std.max())
     ai_confidence = ai_confidence.fillna(0.5).iloc[-1] # 取最新一天的值
 
     # 2. 计算“长周期趋势”分
@@ -65,7 +68,7 @@ def get_unified_decision(
     # 5. 获取对应的杠杆
     leverage = LEVERAGE_MAP.get(state, 1.0)
     
-    logger.info(f"最终评分: {final_score:.2f}, 判定状态: {state}, 基础杠杆: {leverage:.1f}x")
+    logger.info("最终评分: %.2f, 判定状态: %s, 基础杠杆: %.1fx", final_score, state, leverage)
 
     # 6. 返回最终的、可供下游使用的决策包
     return {
@@ -116,8 +119,9 @@ def _extract_market_type(macro_status: str) -> Optional[str]:
         None
     )
 
+@functools.lru_cache(maxsize=512)
 def get_allocation_percent(macro_status: str, symbol: str) -> float:
-    """(此方法保持不变)"""
+    """(此方法保持不变，纯函数，按参数缓存结果)"""
     market_type = _extract_market_type(macro_status)
     if not market_type: 
         return 0.0
@@ -125,7 +129,11 @@ def get_allocation_percent(macro_status: str, symbol: str) -> float:
     return MARKET_ALLOCATIONS.get(market_type, {}).get(coin, 0.0)
 
 def get_dynamic_risk_coefficient(current_drawdown: float) -> float:
-    """(此方法保持不变)"""
+    """回撤按 0.1% 取整后查缓存，细微的回撤波动不应改变风险系数"""
+    return _dynamic_risk_coefficient(round(current_drawdown, 3))
+
+@functools.lru_cache(maxsize=512)
+def _dynamic_risk_coefficient(current_drawdown: float) -> float:
     return max(0.1, 1 - current_drawdown / MAX_DRAWDOWN_LIMIT)
 
 # get_confidence_weight 不再需要，因为置信度已融入主公式
@@ -1,13 +1,14 @@
 import logging
 import os
-from typing import Optional, List, AsyncGenerator
+import aiosqlite
+from typing import Optional, List, Dict, Any, AsyncGenerator
 from functools import wraps
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, MetaData, 
-    select, insert, update, delete, func, Text, text
+    select, insert, update, delete, func, Text, text, event, Index
 )
 
 logger = logging.getLogger(__name__)
@@ -37,10 +38,20 @@ def create_engine_with_pool(database_url: str) -> AsyncEngine:
     """创建带连接池的引擎"""
     return create_async_engine(database_url, echo=False)
 
-DATABASE_URL = f"sqlite+aiosqlite:///{get_db_paths()}"
+DATABASE_PATH = get_db_paths()
+DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
 logger.info(f"数据库路径: {DATABASE_URL}")
 
 engine = create_engine_with_pool(DATABASE_URL)
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    """WAL 日志 + NORMAL 同步级别：写入不再每次事务都 fsync 主库文件"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 metadata = MetaData()
 
 Base = declarative_base(metadata=metadata)
@@ -71,9 +82,16 @@ class ResonanceSignal(Base):
     side = Column(String, nullable=False)
     strength = Column(Float, nullable=False)
     timestamp = Column(Float, nullable=False, index=True)
-    status = Column(String, nullable=False, default='pending', index=True)
+    status = Column(String, nullable=False, default='pending')
     created_at = Column(DateTime, default=func.now())
 
+    # 复合索引的前缀已覆盖按 status 单列的查询，status 不再单独建索引
+    # 加载共振池时按 status 等值 + timestamp 范围过滤并按 timestamp 排序：
+    # 等值列在前的复合索引可同时满足过滤和排序，避免全表扫描和临时排序
+    __table_args__ = (
+        Index('ix_resonance_status_ts', 'status', 'timestamp'),
+    )
+
 class TVStatus(Base):
     __tablename__ = 'tv_status'
     symbol = Column(String, primary_key=True)
@@ -139,11 +157,31 @@ async def init_db() -> None:
         logger.info("正在创建数据库表...")
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            # create_all 不会为已存在的表补建索引，旧数据库需单独迁移
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_resonance_status_ts "
+                "ON resonance_signals (status, timestamp)"
+            ))
         logger.info("✅ 数据库表创建完成")
     except Exception as e:
         logger.error(f"❌ 数据库初始化失败: {str(e)}", exc_info=True)
         raise
 
+async def backup_database(backup_path: str) -> bool:
+    """
+    使用 SQLite 在线备份 API 备份数据库。
+    按页复制，不会读到写入中途的数据，也不阻塞其他写入方。
+    """
+    try:
+        async with aiosqlite.connect(DATABASE_PATH) as source, aiosqlite.connect(backup_path) as target:
+            await source.backup(target, pages=1024)
+            await source.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info(f"数据库已备份到: {backup_path}")
+        return True
+    except Exception as e:
+        logger.error(f"数据库备份失败: {str(e)}", exc_info=True)
+        return False
+
 async def check_database_health() -> bool:
     """检查数据库连接状态"""
     try:
@@ -205,12 +243,34 @@ async def log_trade(symbol: str, quantity: float, entry_price: float,
             session.add(new_trade)
             await session.commit()
             await session.refresh(new_trade)
-            logger.info(f"记录交易: {symbol} {trade_type} {quantity} @ {entry_price} (ID: {new_trade.id})")
+            logger.info("记录交易: %s %s %s @ %s (ID: %s)", symbol, trade_type, quantity, entry_price, new_trade.id)
             return new_trade.id
     except Exception as e:
         logger.error(f"记录交易失败: {str(e)}", exc_info=True)
         raise
 
+async def log_trades_bulk(trades: List[Dict[str, Any]]) -> int:
+    """批量记录交易：一次事务写入所有记录，而不是每条记录单独提交"""
+    if not trades:
+        return 0
+    rows = [
+        {
+            'symbol': t['symbol'], 'quantity': t['quantity'], 'entry_price': t['entry_price'],
+            'trade_type': t['trade_type'].upper(), 'status': t.get('status', 'OPEN').upper(),
+            'strategy_id': t.get('strategy_id', 'default')
+        }
+        for t in trades
+    ]
+    try:
+        async with db_pool.get_session() as session:
+            await session.execute(insert(Trade), rows)
+            await session.commit()
+            logger.info(f"批量记录交易: {len(rows)} 条")
+            return len(rows)
+    except Exception as e:
+        logger.error(f"批量记录交易失败: {str(e)}", exc_info=True)
+        raise
+
 async def close_trade(trade_id: int, exit_price: float) -> bool:
     """平仓"""
     try:
@@ -222,7 +282,7 @@ async def close_trade(trade_id: int, exit_price: float) -> bool:
             await session.commit()
             
             if result.rowcount > 0:
-                logger.info(f"交易 {trade_id} 已平仓 @ {exit_price}")
+                logger.info("交易 %s 已平仓 @ %s", trade_id, exit_price)
                 return True
             return False
     except Exception as e:
@@ -272,7 +332,7 @@ async def update_tv_status(symbol: str, status: str) -> None:
                 await session.execute(insert(TVStatus).values(symbol=symbol, status=status))
             
             await session.commit()
-            logger.info(f"TV 状态已更新: {symbol} -> {status}")
+            logger.info("TV 状态已更新: %s -> %s", symbol, status)
     except Exception as e:
         logger.error(f"更新 TV 状态失败: {symbol} -> {status}, 错误: {e}", exc_info=True)
         raise
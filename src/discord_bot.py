@@ -49,12 +49,24 @@ class TradingCommands(commands.Cog, name="TradingCommands"):
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # 交易引擎未启动时，面板刷新复用最近一次的宏观决策，避免每次刷新都请求 AI 接口
+        self._macro_status_cache: Optional[Dict[str, Any]] = None
+        self._macro_status_time: float = 0.0
     
     # --- 【核心修改】重写 get_macro_status 以适配新的 MacroAnalyzer ---
     async def get_macro_status(self) -> Dict[str, Any]:
         """获取宏观状态信息"""
         try:
             app_state = self.bot.app.state
+            # 交易引擎已启动时直接复用它的宏观决策缓存，面板与下单看到的是同一份决策
+            trading_engine = getattr(app_state, 'trading_engine', None)
+            if trading_engine is not None:
+                return await trading_engine.get_macro_decision()
+            
+            if (self._macro_status_cache is not None
+                    and time.monotonic() - self._macro_status_time < CONFIG.macro_cache_timeout):
+                return self._macro_status_cache
+            
             macro_analyzer = getattr(app_state, 'macro_analyzer', None)
             
             if not macro_analyzer:
@@ -63,6 +75,8 @@ class TradingCommands(commands.Cog, name="TradingCommands"):
             
             # 调用新的核心决策方法，它返回一个字典
             decision = await macro_analyzer.get_macro_decision()
+            self._macro_status_cache = decision
+            self._macro_status_time = time.monotonic()
             return decision
             
         except Exception as e:
@@ -88,61 +102,8 @@ class TradingCommands(commands.Cog, name="TradingCommands"):
             from src.discord_ui import MainPanelView # 假设这个UI视图存在
 
             view = MainPanelView(self.bot)
-            embed = discord.Embed(title="🎛️ 主控制面板", color=discord.Color.blue())
-            embed.description = "使用下方按钮查看详细信息或进行操作。"
-            
-            app_state = self.bot.app.state
-            trading_engine = getattr(app_state, 'trading_engine', None)
-            
-            # --- 【核心修改】适配新的宏观决策逻辑和显示 ---
-            macro_decision = await self.get_macro_status()
-            
-            market_season = macro_decision.get('market_season', 'OSC')
-            score = macro_decision.get('score', 0.0)
-            ai_confidence = macro_decision.get('confidence', 0.0)
-            
-            state_display = {
-                'BULL': '🐂 牛市',
-                'BEAR': '🐻 熊市',
-                'OSC': '🔄 震荡'
-            }.get(market_season, '❓ 未知')
-            
-            macro_text = (
-                f"**宏观状态**: {state_display}\n"
-                f"**市场综合分数**: {score:.2f}\n"
-                f"**AI 置信度**: {ai_confidence:.2f}"
-            )
-            embed.add_field(name="🌍 宏观参谋部", value=macro_text, inline=True)
-
-            # --- (后面获取持仓、报警、共振池的逻辑保持不变) ---
-            pnl_text, position_text = "无", "无持仓"
-            if trading_engine:
-                positions = await trading_engine.get_position("*")
-                if positions:
-                    total_pnl = sum(float(p.get('unrealizedPnl', 0)) for p in positions.values() if p) # 使用 unrealizedPnl
-                    pnl_text = f"{'🟢' if total_pnl >= 0 else '🔴'} ${total_pnl:,.2f}"
-                    active_positions = [f"{p['symbol']} ({'多' if float(p.get('contracts',0)) > 0 else '空'})" for p in positions.values() if p and float(p.get('contracts', 0)) != 0]
-                    if active_positions: position_text = ", ".join(active_positions)
-            embed.add_field(name="📈 核心持仓", value=position_text, inline=True)
-            embed.add_field(name="💰 今日浮盈", value=pnl_text, inline=True)
-
-            alert_system = getattr(app_state, 'alert_system', None)
-            alert_status_text = "⚪ 未启用"
-            if alert_system:
-                alert_status = alert_system.get_status()
-                alert_status_text = f"{'🔴' if alert_status.get('active') else '🟢'} 正常"
-            embed.add_field(name="🚨 报警状态", value=alert_status_text, inline=True)
-
-            pool_text = "⚪ 未启用"
-            if trading_engine:
-                # 【核心修改】移除 await，因为 get_resonance_pool 不是异步方法
-                pool_data = trading_engine.get_resonance_pool()
-                pending_count = sum(1 for signal in pool_data.values() if signal.get('status') == 'pending')
-                pool_text = f"⏳ {pending_count} 个待处理"
-            embed.add_field(name="📡 共振池", value=pool_text, inline=True)
-
-            embed.set_footer(text=f"模式: {CONFIG.run_mode.upper()} | 最后刷新于")
-            embed.timestamp = discord.utils.utcnow()
+            # 面板内容与“刷新”按钮共用同一个构建函数
+            embed = await view._get_main_panel_embed()
 
             await interaction.followup.send(embed=embed, view=view, ephemeral=True)
 
@@ -2,13 +2,16 @@ import logging
 import asyncio
 import time
 import os
+import ssl
 from contextlib import asynccontextmanager
 from typing import Optional, Dict, Any
 
+import aiohttp
+import orjson
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
-from ccxt.async_support import binance
+from ccxt.pro import binance  # 与 async_support 接口一致，额外提供 WebSocket 订阅
 import uvicorn
 
 # --- 导入配置 ---
@@ -60,8 +63,25 @@ async def lifespan(app: FastAPI):
             'apiKey': CONFIG.binance_api_key,
             'secret': CONFIG.binance_api_secret,
             'enableRateLimit': True,
-            'options': {'defaultType': 'future', 'adjustForTimeDifference': True}
+            'rateLimit': 50,  # 币安 1200 次/分钟的请求配额
+            'options': {
+                'defaultType': 'future',
+                'adjustForTimeDifference': True,
+                'warnOnFetchOpenOrdersWithoutSymbol': False,
+                # 先取一次完整余额快照，之后的推送在快照上增量合并，交易引擎可直接使用
+                'watchBalance': {'fetchBalanceSnapshot': True, 'awaitBalanceSnapshot': True}
+            }
         })
+        # 自定义连接池：更大的并发连接上限、DNS 缓存和长连接保活，突发信号时复用已建立的 TLS 连接；
+        # own_session 保持为 True，exchange.close() 时由 ccxt 负责关闭该会话
+        exchange.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                ssl=ssl.create_default_context(cafile=exchange.cafile),
+                limit=100, ttl_dns_cache=300, keepalive_timeout=60, enable_cleanup_closed=True
+            ),
+            trust_env=exchange.aiohttp_trust_env
+        )
+        exchange.own_session = True
         await exchange.load_markets()
         app.state.exchange = exchange
         logger.info("✅ 交易所连接已建立")
@@ -102,6 +122,16 @@ async def lifespan(app: FastAPI):
     finally:
         logger.info("🛑 系统关闭中...")
         await SystemState.set_state("SHUTDOWN")
+        trading_engine = getattr(app.state, 'trading_engine', None)
+        if trading_engine:
+            await trading_engine.close()
+        macro_analyzer = getattr(app.state, 'macro_analyzer', None)
+        if macro_analyzer:
+            await macro_analyzer.ai_client.close()
+        exchange = getattr(app.state, 'exchange', None)
+        if exchange:
+            # 交易所实例在整个生命周期内复用同一个 HTTP 会话，关闭时统一释放
+            await exchange.close()
         # ... (关闭逻辑保持不变) ...
 
 # --- FastAPI 应用 (无变动) ---
@@ -132,7 +162,7 @@ async def handle_factor_update(data: Dict[str, Any]):
     
     # 简单的逻辑映射
     # 在真实系统中，这里会更复杂，需要更新因子历史文件或数据库
-    logger.info(f"接收到状态更新信号: {strategy_id} -> {action}")
+    logger.info("接收到状态更新信号: %s -> %s", strategy_id, action)
     # 示例：可以调用一个数据库函数来更新状态
     # await update_factor_status_in_db(strategy_id, action)
     return {"status": "factor update received"}
@@ -148,7 +178,7 @@ async def tradingview_webhook(request: Request):
         # (假设您有签名验证逻辑)
         # ...
         
-        data = await request.json()
+        data = orjson.loads(await request.body())
         strategy_id = data.get("strategy_id")
         
         if not strategy_id:
@@ -164,13 +194,13 @@ async def tradingview_webhook(request: Request):
         # 3. 【核心】智能判断和任务分发
         if strategy_id in FACTOR_UPDATE_STRATEGIES:
             # 如果是“状态信号”，转接给“后台数据部门”
-            logger.info(f"识别到状态信号: {strategy_id}。")
+            logger.info("识别到状态信号: %s。", strategy_id)
             response = await handle_factor_update(data)
             return response
             
         else: # 默认所有其他ID都是“行动信号”
             # 就转接给“前线交易部门”
-            logger.info(f"识别到行动信号: {strategy_id}。正在转发至交易引擎...")
+            logger.info("识别到行动信号: %s。正在转发至交易引擎...", strategy_id)
             
             trading_engine = getattr(request.app.state, 'trading_engine', None)
             if not trading_engine:
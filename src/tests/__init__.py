@@ -4,4 +4,4 @@
 """
 
 # 导出所有测试模块
-__all__ = ["test_database", "test_core"]
+__all__ = ["test_database", "test_core", "test_trading_engine"]
@@ -4,6 +4,7 @@ import numpy as np
 import sys
 import os
 import tempfile
+import functools
 
 # 添加上级目录到系统路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -13,23 +14,28 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 import src.core_logic
 import src.config
 
+@functools.lru_cache(maxsize=None)
+def _generate_ohlcv() -> tuple:
+    """生成模拟K线数据（只生成一次，后续调用直接复用）"""
+    rng = np.random.RandomState(42)
+    prices = np.cumprod(1 + rng.randn(100) * 0.01) * 50000
+    timestamps = np.arange(100) * 3600000
+    noise = rng.randn(100, 4)
+    
+    ohlc = np.column_stack([
+        timestamps,
+        prices,
+        prices + np.abs(noise[:, 0] * 100),
+        prices - np.abs(noise[:, 1] * 100),
+        prices + noise[:, 2] * 50,
+        1000 + np.abs(noise[:, 3] * 500)
+    ])
+    return tuple((int(row[0]), *row[1:]) for row in ohlc.tolist())
+
 class MockExchange:
     async def fetch_ohlcv(self, symbol, timeframe, limit):
-        # 生成模拟数据
-        np.random.seed(42)
-        prices = np.cumprod(1 + np.random.randn(100) * 0.01) * 50000
-        timestamps = [i * 3600000 for i in range(100)]
-        
-        ohlc_data = []
-        for ts, p in zip(timestamps, prices):
-            open_p = p
-            high_p = p + abs(np.random.randn() * 100)
-            low_p = p - abs(np.random.randn() * 100)
-            close_p = p + np.random.randn() * 50
-            volume = 1000 + abs(np.random.randn() * 500)
-            ohlc_data.append([ts, open_p, high_p, low_p, close_p, volume])
-            
-        return ohlc_data
+        # 返回缓存的模拟数据的副本，避免调用方修改共享数据
+        return [list(row) for row in _generate_ohlcv()]
 
 class TestCoreLogic(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self):
@@ -1,11 +1,11 @@
 import unittest
-import asyncio
 import sys
 import os
 import logging
 import tempfile
 import aiosqlite
 import time
+from unittest.mock import patch
 
 # 配置日志
 logging.basicConfig(
@@ -51,9 +51,6 @@ class TestDatabase(unittest.IsolatedAsyncioTestCase):
     
     async def test_table_creation(self):
         """验证表是否创建成功"""
-        # 给数据库一点时间完成初始化
-        await asyncio.sleep(0.1)
-        
         async with aiosqlite.connect(self.temp_db) as db:
             cursor = await db.execute("SELECT name FROM sqlite_master WHERE type='table'")
             tables = await cursor.fetchall()
@@ -76,9 +73,6 @@ class TestDatabase(unittest.IsolatedAsyncioTestCase):
         )
         await self.db.add_position(position)
         
-        # 给数据库一点时间完成写入
-        await asyncio.sleep(0.1)
-        
         # 查询持仓
         positions = await src.database.DatabaseManager.get_positions("simulate")
         self.assertEqual(len(positions), 1)
@@ -98,9 +92,6 @@ class TestDatabase(unittest.IsolatedAsyncioTestCase):
         )
         await self.db.add_trade(trade)
         
-        # 给数据库一点时间完成写入
-        await asyncio.sleep(0.1)
-        
         # 查询交易
         trades = await src.database.DatabaseManager.get_trades("ETH/USDT")
         self.assertEqual(len(trades), 1)
@@ -131,9 +122,6 @@ class TestDatabase(unittest.IsolatedAsyncioTestCase):
         )
         await self.db.add_trade(trade)
         
-        # 给数据库一点时间完成写入
-        await asyncio.sleep(0.1)
-        
         # 创建临时备份文件
         backup_path = tempfile.NamedTemporaryFile(suffix=".backup.db", delete=False).name
         
@@ -173,5 +161,52 @@ class TestDatabase(unittest.IsolatedAsyncioTestCase):
         
         logger.info("数据库备份测试通过")
 
+class TestDatabaseFunctions(unittest.IsolatedAsyncioTestCase):
+    """针对模块级数据库函数的测试，使用临时数据库文件"""
+
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_db = os.path.join(self.temp_dir.name, "test.db")
+        temp_engine = src.database.create_engine_with_pool(f"sqlite+aiosqlite:///{self.temp_db}")
+        for name, value in (
+            ('DATABASE_PATH', self.temp_db),
+            ('engine', temp_engine),
+            ('db_pool', src.database.DatabaseConnectionPool(temp_engine)),
+        ):
+            patcher = patch.object(src.database, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addAsyncCleanup(temp_engine.dispose)
+        await src.database.init_db()
+
+    async def test_backup_database(self):
+        """在线备份得到的文件包含已写入的记录"""
+        await src.database.log_trade("BTC/USDT", 0.1, 50000.0, "long")
+        backup_path = os.path.join(self.temp_dir.name, "test.backup.db")
+
+        self.assertTrue(await src.database.backup_database(backup_path))
+
+        async with aiosqlite.connect(backup_path) as db:
+            cursor = await db.execute("SELECT symbol, quantity FROM trades")
+            self.assertEqual(await cursor.fetchall(), [("BTC/USDT", 0.1)])
+
+    async def test_log_trades_bulk(self):
+        """批量记录交易在一个事务中写入全部记录"""
+        trades = [
+            {'symbol': 'BTC/USDT', 'quantity': 0.1, 'entry_price': 50000.0, 'trade_type': 'long'},
+            {'symbol': 'ETH/USDT', 'quantity': 1.5, 'entry_price': 3000.0, 'trade_type': 'short',
+             'status': 'closed', 'strategy_id': 's1'},
+        ]
+        self.assertEqual(await src.database.log_trades_bulk(trades), 2)
+        self.assertEqual(await src.database.log_trades_bulk([]), 0)
+
+        async with aiosqlite.connect(self.temp_db) as db:
+            cursor = await db.execute("SELECT symbol, trade_type, status, strategy_id FROM trades ORDER BY id")
+            self.assertEqual(await cursor.fetchall(), [
+                ("BTC/USDT", "LONG", "OPEN", "default"),
+                ("ETH/USDT", "SHORT", "CLOSED", "s1"),
+            ])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,508 @@
+import unittest
+import asyncio
+import sys
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import ccxt
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+# 添加上级目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# 使用绝对导入
+import src.trading_engine
+from src.trading_engine import TradingEngine, RetryPolicy
+
+class TestTradingEngine(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.exchange = MagicMock()
+        self.alert_system = MagicMock()
+        self.alert_system.trigger_alert = AsyncMock()
+        self.macro_analyzer = MagicMock()
+        # 与 ccxt 一致，market() 从已加载的 markets 中查找交易对
+        self.exchange.market.side_effect = lambda symbol: self.exchange.markets[symbol]
+        self.engine = TradingEngine(self.exchange, self.alert_system, self.macro_analyzer)
+
+    def _track_order(self, order_id: str) -> None:
+        """登记一笔未完成的限价买单，模拟下单后等待终态的订单"""
+        self.engine.active_orders[order_id] = src.trading_engine.Order(
+            symbol='BTC/USDT', type='limit', side='buy', amount=1.0, price=100.0,
+            status='open', filled=0.0, timestamp=time.time(), mono_ts=time.monotonic()
+        )
+
+    def _mock_db_session(self) -> AsyncMock:
+        """替换交易引擎的数据库连接池，返回其会话的 mock；测试结束时自动恢复"""
+        patcher = patch.object(src.trading_engine, 'db_pool')
+        mock_pool = patcher.start()
+        self.addCleanup(patcher.stop)
+        session = AsyncMock()
+        mock_pool.get_session.return_value.__aenter__.return_value = session
+        return session
+
+    def _mock_order_inputs(self, free_margin: float = 1000.0) -> None:
+        """BULL 宏观状态、BTC/USDT 合约报价 100、账户权益 1000 USDT 的下单环境"""
+        self.macro_analyzer.factor_history = []
+        # 与 MacroAnalyzer.get_macro_decision 的真实返回结构一致
+        self.macro_analyzer.get_macro_decision = AsyncMock(
+            return_value={'market_season': 'BULL', 'score': 0.5, 'confidence': 0.8, 'liquidation_signal': None}
+        )
+        self.exchange.fetch_ticker = AsyncMock(return_value={'last': 100.0})
+        self.exchange.markets = {'BTC/USDT': {'limits': {'amount': {'min': 0.001}}, 'contract': True, 'settle': 'USDT'}}
+        self.exchange.fetch_balance = AsyncMock(
+            return_value={'total': {'USDT': 1000.0}, 'USDT': {'free': free_margin}}
+        )
+
+    async def test_retry_on_network_error(self):
+        """网络类异常应按退避策略重试"""
+        func = AsyncMock(side_effect=[ccxt.NetworkError("timeout"), {"id": "1"}])
+        with patch.object(src.trading_engine.asyncio, 'sleep', new=AsyncMock()) as mock_sleep:
+            result = await self.engine._execute_with_retry(func)
+        self.assertEqual(result, {"id": "1"})
+        self.assertEqual(func.await_count, 2)
+        mock_sleep.assert_awaited_once()
+
+    async def test_no_retry_on_permanent_error(self):
+        """永久性错误（如资金不足）应立即抛出，不做等待"""
+        func = AsyncMock(side_effect=ccxt.InsufficientFunds("no money"))
+        with patch.object(src.trading_engine.asyncio, 'sleep', new=AsyncMock()) as mock_sleep:
+            with self.assertRaises(ccxt.InsufficientFunds):
+                await self.engine._execute_with_retry(func)
+        self.assertEqual(func.await_count, 1)
+        mock_sleep.assert_not_awaited()
+
+    async def test_circuit_breaker_short_circuits_calls(self):
+        """连续失败达到阈值后熔断，冷却期内不再调用交易所"""
+        self.engine.BREAKER_THRESHOLD = 2
+        func = AsyncMock(side_effect=ccxt.NetworkError("down"))
+        with patch.object(src.trading_engine.asyncio, 'sleep', new=AsyncMock()) as mock_sleep:
+            with self.assertRaises(ccxt.NetworkError):
+                await self.engine._execute_with_retry(func, max_retries=5)
+        self.assertEqual(func.await_count, 2)
+        # 触发熔断的那次失败后立即抛出，不再退避等待
+        mock_sleep.assert_awaited_once()
+        self.assertEqual(self.engine._breaker['state'], 'open')
+        self.alert_system.trigger_alert.assert_awaited_once()
+
+        with self.assertRaises(ccxt.ExchangeNotAvailable):
+            await self.engine._execute_with_retry(func)
+        self.assertEqual(func.await_count, 2)
+
+        # 冷却结束后放行试探调用，成功即恢复
+        func = AsyncMock(return_value={"id": "1"})
+        opened_at = self.engine._breaker['opened_at']
+        with patch.object(src.trading_engine.time, 'monotonic', return_value=opened_at + self.engine.BREAKER_COOLDOWN):
+            self.assertEqual(await self.engine._execute_with_retry(func), {"id": "1"})
+        self.assertEqual(self.engine._breaker, {'state': 'closed', 'failures': 0, 'opened_at': opened_at, 'probing': False})
+
+    async def test_half_open_breaker_allows_single_probe(self):
+        """冷却结束后只放行一个试探调用，并发的其他调用继续被拒绝"""
+        self.engine._breaker.update(state='open', failures=5, opened_at=time.monotonic() - self.engine.BREAKER_COOLDOWN)
+        release = asyncio.Event()
+        async def probe():
+            await release.wait()
+            return {"id": "1"}
+        probe_task = asyncio.create_task(self.engine._execute_with_retry(probe))
+        await asyncio.sleep(0)
+        func = AsyncMock(return_value={"id": "2"})
+        with self.assertRaises(ccxt.ExchangeNotAvailable):
+            await self.engine._execute_with_retry(func)
+        func.assert_not_awaited()
+        release.set()
+        self.assertEqual(await probe_task, {"id": "1"})
+        self.assertEqual(self.engine._breaker['state'], 'closed')
+        self.assertEqual(await self.engine._execute_with_retry(func), {"id": "2"})
+
+        # 试探调用遇到非网络类异常时释放名额，下一个调用可以继续试探
+        self.engine._breaker.update(state='half_open', probing=False)
+        with self.assertRaises(ccxt.InsufficientFunds):
+            await self.engine._execute_with_retry(AsyncMock(side_effect=ccxt.InsufficientFunds("no money")))
+        self.assertFalse(self.engine._breaker['probing'])
+
+    def test_retry_delay_is_capped(self):
+        """加上抖动后退避时间仍不超过 max_delay"""
+        policy = RetryPolicy(initial_delay=1.0, max_delay=4.0)
+        for attempt in range(10):
+            self.assertLessEqual(policy.get_delay(attempt), 4.0)
+        self.assertEqual(RetryPolicy(jitter=False, max_delay=4.0).get_delay(10), 4.0)
+
+    def test_reconnect_delay_allows_longer_backoff(self):
+        """数据流重连的退避上限大于下单重试，且长时间断线不会溢出"""
+        policy = TradingEngine.RECONNECT_POLICY
+        self.assertGreater(policy.max_delay, TradingEngine.RETRY_POLICY.max_delay)
+        self.assertLessEqual(policy.get_delay(5000), policy.max_delay)
+
+    async def test_execute_order_sizes_position(self):
+        """按宏观分配比例、风险系数与杠杆计算下单数量"""
+        self._mock_order_inputs()
+        self.exchange.create_order = AsyncMock(return_value={'id': '1', 'status': 'open'})
+        self.exchange.fetch_order = AsyncMock(return_value={'status': 'closed'})
+        signal = {'strategy_id': 's1', 'symbol': 'BTC/USDT', 'action': 'long'}
+        result = await self.engine.execute_order(signal, account_equity=1000.0)
+        self.assertEqual(result['id'], '1')
+        # 1000 * 0.30 (BULL 下 BTC 分配) * 1.0 (无回撤) * 3.0 (BULL 杠杆) / 100
+        self.assertAlmostEqual(self.exchange.create_order.await_args.kwargs['amount'], 9.0)
+        # 信号方向 long 映射为币安接受的 buy
+        self.assertEqual(self.exchange.create_order.await_args.kwargs['side'], 'buy')
+        self.assertEqual(self.engine.active_orders['1'].side, 'buy')
+
+        # 监控任务被跟踪，关闭引擎时一并结束
+        self.assertEqual(len(self.engine._monitor_tasks), 1)
+        await self.engine.close()
+        self.assertEqual(len(self.engine._monitor_tasks), 0)
+
+    async def test_order_stream_updates_active_orders(self):
+        """订单数据流推送终态后订单被移除，监控任务不再请求交易所"""
+        self._track_order('1')
+        self.exchange.fetch_order = AsyncMock()
+        self.engine._order_stream_healthy = True
+        self.engine._apply_order_update({'id': '1', 'status': 'open', 'filled': 0.5})
+        self.assertEqual(self.engine.active_orders['1'].filled, 0.5)
+        self.engine._apply_order_update({'id': '1', 'status': 'closed', 'filled': 1.0})
+        await self.engine._monitor_order('1')
+        self.assertNotIn('1', self.engine.active_orders)
+        self.exchange.fetch_order.assert_not_awaited()
+
+    async def test_execute_order_aborts_on_insufficient_margin(self):
+        """保证金不足时不下单"""
+        # 9 张 * 100 / 3 倍杠杆需要 300 USDT 保证金
+        self._mock_order_inputs(free_margin=299.0)
+        self.exchange.create_order = AsyncMock()
+        signal = {'strategy_id': 's1', 'symbol': 'BTC/USDT', 'action': 'long'}
+        self.assertIsNone(await self.engine.execute_order(signal))
+        self.exchange.create_order.assert_not_awaited()
+        # 权益与保证金检查共用一次余额查询
+        self.exchange.fetch_balance.assert_awaited_once()
+        self.assertEqual(self.alert_system.trigger_alert.await_args.kwargs['alert_type'], 'INSUFFICIENT_FUNDS')
+
+    async def test_terminal_update_before_create_order_returns(self):
+        """终态推送先于下单返回到达时，订单不再被跟踪"""
+        self._mock_order_inputs()
+        async def create_order(**kwargs):
+            self.engine._apply_order_update({'id': '1', 'status': 'closed', 'filled': 9.0})
+            return {'id': '1', 'status': 'open'}
+        self.exchange.create_order = create_order
+        signal = {'strategy_id': 's1', 'symbol': 'BTC/USDT', 'action': 'long'}
+        result = await self.engine.execute_order(signal, account_equity=1000.0)
+        self.assertEqual(result['id'], '1')
+        self.assertNotIn('1', self.engine.active_orders)
+        self.assertEqual(len(self.engine._monitor_tasks), 0)
+        self.assertEqual(len(self.engine._recent_terminal_orders), 0)
+
+    async def test_monitor_wakes_on_stream_event(self):
+        """数据流推送终态后监控任务立即结束"""
+        self._track_order('1')
+        self.engine._order_stream_healthy = True
+        monitor = asyncio.create_task(self.engine._monitor_order('1'))
+        await asyncio.sleep(0)
+        self.engine._apply_order_update({'id': '1', 'status': 'closed'})
+        await asyncio.wait_for(monitor, timeout=1)
+        self.assertEqual(self.engine._order_events, {})
+
+    async def test_poll_loop_wakes_monitor_without_stream(self):
+        """没有订单数据流时由轮询任务集中查询订单并唤醒监控任务"""
+        self._track_order('1')
+        self.exchange.fetch_order = AsyncMock(return_value={'id': '1', 'status': 'closed'})
+        monitor = asyncio.create_task(self.engine._monitor_order('1'))
+        poller = asyncio.create_task(self.engine._order_poll_loop())
+        await asyncio.wait_for(monitor, timeout=1)
+        poller.cancel()
+        self.exchange.fetch_order.assert_awaited_once_with('1', 'BTC/USDT')
+        self.assertNotIn('1', self.engine.active_orders)
+
+    async def test_monitor_times_out_and_cancels(self):
+        """超时未完成的订单触发报警并撤单"""
+        self.engine.order_timeout = 0.01
+        self._track_order('1')
+        self.exchange.cancel_order = AsyncMock()
+        await self.engine._monitor_order('1')
+        self.alert_system.trigger_alert.assert_awaited_once()
+        self.assertEqual(self.alert_system.trigger_alert.await_args.kwargs['alert_type'], 'ORDER_TIMEOUT')
+        self.exchange.cancel_order.assert_awaited_once_with('1', 'BTC/USDT')
+        self.assertNotIn('1', self.engine.active_orders)
+
+    async def test_failed_timeout_cancel_keeps_tracking_order(self):
+        """超时撤单失败时订单继续留在活跃订单中，报警说明撤单失败"""
+        self.engine.order_timeout = 0.01
+        self._track_order('1')
+        self.exchange.cancel_order = AsyncMock(side_effect=ccxt.OrderNotFound("gone"))
+        await self.engine._monitor_order('1')
+        self.assertIn('1', self.engine.active_orders)
+        self.assertIn('撤单失败', self.alert_system.trigger_alert.await_args.kwargs['message'])
+
+    async def test_timeout_without_alert_system_keeps_tracking_order(self):
+        """未配置报警系统时，超时撤单失败的订单同样继续跟踪"""
+        self.engine.alert_system = None
+        self.engine.order_timeout = 0.01
+        self._track_order('1')
+        self.exchange.cancel_order = AsyncMock(side_effect=ccxt.OrderNotFound("gone"))
+        await self.engine._monitor_order('1')
+        self.assertIn('1', self.engine.active_orders)
+
+    async def test_ticker_and_balance_are_cached(self):
+        """短时间内重复获取行情和余额只请求一次交易所"""
+        self.exchange.fetch_ticker = AsyncMock(return_value={'last': 100.0})
+        self.exchange.fetch_balance = AsyncMock(return_value={'USDT': {'free': 1000}})
+        for _ in range(3):
+            await self.engine._get_cached_ticker('BTC/USDT')
+            await self.engine._get_cached_balance()
+        self.exchange.fetch_ticker.assert_awaited_once_with('BTC/USDT')
+        self.exchange.fetch_balance.assert_awaited_once()
+
+    async def test_get_position_filters_by_symbol(self):
+        """单个交易对只请求该交易对的持仓，并在短时间内复用结果"""
+        position = {'symbol': 'BTC/USDT', 'contracts': 1.0}
+        self.exchange.fetch_positions = AsyncMock(return_value=[position])
+        for _ in range(2):
+            self.assertEqual(await self.engine.get_position('BTC/USDT'), {'BTC/USDT': position})
+        self.exchange.fetch_positions.assert_awaited_once_with(['BTC/USDT'])
+
+    async def test_get_position_prefers_open_side_in_hedge_mode(self):
+        """双向持仓模式下返回有持仓数量的一侧，而不是固定取第一条"""
+        long_side = {'symbol': 'BTC/USDT', 'side': 'long', 'contracts': 0.0}
+        short_side = {'symbol': 'BTC/USDT', 'side': 'short', 'contracts': 2.0}
+        self.exchange.fetch_positions = AsyncMock(return_value=[long_side, short_side])
+        self.assertEqual(await self.engine.get_position('BTC/USDT'), {'BTC/USDT': short_side})
+
+        self.exchange.fetch_positions = AsyncMock(return_value=[])
+        self.assertEqual(await self.engine.get_position('ETH/USDT'), {})
+
+    async def test_concurrent_ticker_requests_are_coalesced(self):
+        """同一交易对的并发行情请求只访问交易所一次"""
+        async def slow_ticker(symbol):
+            await asyncio.sleep(0.01)
+            return {'last': 100.0}
+        self.exchange.fetch_ticker = AsyncMock(side_effect=slow_ticker)
+        results = await asyncio.gather(*(self.engine._get_cached_ticker('BTC/USDT') for _ in range(5)))
+        self.assertTrue(all(r['last'] == 100.0 for r in results))
+        self.exchange.fetch_ticker.assert_awaited_once_with('BTC/USDT')
+        self.assertEqual(self.engine._ticker_inflight, {})
+
+    async def test_price_stream_feeds_ticker_cache(self):
+        """订阅行情推送后下单读取本地价格，不再请求 REST 行情"""
+        self.exchange.has = {'watchTicker': True}
+        pushed = asyncio.Event()
+        async def watch_ticker(symbol):
+            if pushed.is_set():
+                await asyncio.sleep(3600)
+            pushed.set()
+            return {'last': 101.0}
+        self.exchange.watch_ticker = AsyncMock(side_effect=watch_ticker)
+        self.exchange.fetch_ticker = AsyncMock(return_value={'last': 100.0})
+        self.engine._ensure_price_stream('BTC/USDT')
+        await pushed.wait()
+        await asyncio.sleep(0)
+        ticker = await self.engine._get_cached_ticker('BTC/USDT')
+        self.assertEqual(ticker['last'], 101.0)
+        self.exchange.fetch_ticker.assert_not_awaited()
+        await self.engine.close()
+        self.assertEqual(len(self.engine._price_streams), 0)
+
+    async def test_balance_stream_replaces_rest_fetch(self):
+        """余额推送正常时直接使用推送的余额，不受缓存时间限制"""
+        pushed = asyncio.Event()
+        async def watch_balance():
+            if pushed.is_set():
+                await asyncio.sleep(3600)
+            pushed.set()
+            return {'total': {'USDT': 500.0}}
+        self.exchange.watch_balance = AsyncMock(side_effect=watch_balance)
+        self.exchange.fetch_balance = AsyncMock()
+        self.engine._balance_stream_task = asyncio.create_task(self.engine._balance_stream_loop())
+        await pushed.wait()
+        await asyncio.sleep(0)
+        balance = await self.engine._get_cached_balance(ttl=0)
+        self.assertEqual(balance['total']['USDT'], 500.0)
+        self.exchange.fetch_balance.assert_not_awaited()
+        await self.engine.close()
+        self.assertFalse(self.engine._balance_stream_healthy)
+
+    async def test_macro_decision_is_cached(self):
+        """并发订单只触发一次宏观决策计算"""
+        self.macro_analyzer.factor_history = [1, 2, 3]
+        self.macro_analyzer.get_macro_decision = AsyncMock(return_value={'market_season': 'BULL'})
+        results = await asyncio.gather(*(self.engine._get_cached_macro_decision() for _ in range(5)))
+        self.assertTrue(all(r['market_season'] == 'BULL' for r in results))
+        # 对外接口（Discord 面板）复用同一份缓存
+        self.assertEqual(await self.engine.get_macro_decision(), {'market_season': 'BULL'})
+        self.macro_analyzer.get_macro_decision.assert_awaited_once()
+
+        # 因子数据更新后应重新计算
+        self.macro_analyzer.factor_history = [1, 2, 3, 4]
+        await self.engine._get_cached_macro_decision()
+        self.assertEqual(self.macro_analyzer.get_macro_decision.await_count, 2)
+
+    async def test_expired_signals_removed_from_pool(self):
+        """超时的共振信号在查询共振池时被移除"""
+        self.engine.signal_timeout = 60
+        now = time.monotonic()
+        self._mock_db_session()
+        await self.engine.add_signal('old', {'symbol': 'BTC/USDT', 'timeframe': '1h', 'side': 'long', 'strength': 50})
+        await self.engine.add_signal('new', {'symbol': 'BTC/USDT', 'timeframe': '1h', 'side': 'long', 'strength': 50})
+        # 重新添加的信号以新的时间戳计算过期，堆中的旧条目被丢弃而不是重新压入
+        with patch.object(src.trading_engine.time, 'monotonic', return_value=now + 30):
+            await self.engine.add_signal('new', {'symbol': 'BTC/USDT', 'timeframe': '1h', 'side': 'long', 'strength': 50})
+        with patch.object(src.trading_engine.time, 'monotonic', return_value=now + 61):
+            pool = await self.engine.get_resonance_pool()
+        self.assertEqual(list(pool['signals']), ['new'])
+        self.assertEqual(pool['pending_count'], 1)
+        self.assertEqual([signal_id for _, signal_id in self.engine._expiry_heap], ['new'])
+
+    async def test_pending_count_tracks_status_changes(self):
+        """待处理计数随信号增删与状态变化增量更新"""
+        signal = {'symbol': 'BTC/USDT', 'timeframe': '1h', 'side': 'long', 'strength': 50}
+        self._mock_db_session()
+        for signal_id in ('a', 'b', 'c'):
+            await self.engine.add_signal(signal_id, signal)
+        await self.engine.add_signal('a', signal)  # 重复信号不重复计数
+        await self.engine.update_signal_status('b', 'executed')
+        await self.engine.remove_signal('c')
+        # 字段缺失的信号被拒绝，计数不变
+        with self.assertRaises(ValueError):
+            await self.engine.add_signal('d', {'symbol': 'BTC/USDT'})
+        with self.assertRaises(ValueError):
+            await self.engine.add_signal('e', {**signal, 'strength': None})
+        pool = await self.engine.get_resonance_pool()
+        self.assertEqual(pool['count'], 2)
+        self.assertEqual(pool['pending_count'], 1)
+
+    async def test_signal_inserts_are_batched(self):
+        """多个新信号在一次数据库会话中批量写入"""
+        session = self._mock_db_session()
+        for i in range(3):
+            await self.engine.add_signal(f's{i}', {'symbol': 'BTC/USDT', 'timeframe': '1h', 'side': 'long', 'strength': 50})
+        session.execute.assert_not_awaited()
+        await self.engine.flush_signals()
+        session.execute.assert_awaited_once()
+        rows = session.execute.await_args.args[1]
+        self.assertEqual([r['id'] for r in rows], ['s0', 's1', 's2'])
+
+    async def test_close_waits_for_inflight_flush(self):
+        """关闭引擎时正在写入的批次不会因任务取消而丢失"""
+        writing, release = asyncio.Event(), asyncio.Event()
+        written = []
+        async def execute(stmt, rows):
+            writing.set()
+            await release.wait()
+            written.extend(row['id'] for row in rows)
+        session = self._mock_db_session()
+        session.execute.side_effect = execute
+        self.engine._signal_flush_task = asyncio.create_task(self.engine._signal_flush_loop())
+        await self.engine.add_signal('a', {'symbol': 'BTC/USDT', 'timeframe': '1h', 'side': 'long', 'strength': 50})
+        await writing.wait()
+        closing = asyncio.create_task(self.engine.close())
+        await asyncio.sleep(0)
+        release.set()
+        await closing
+        self.assertEqual(written, ['a'])
+        self.assertIsNone(self.engine._signal_flush_task)
+
+    async def test_context_manager_preloads_markets(self):
+        """进入上下文时预加载市场信息，退出时停止后台写入任务"""
+        self.exchange.markets = None
+        self.exchange.load_markets = AsyncMock()
+        session = self._mock_db_session()
+        session.execute.return_value.mappings = MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+        async with self.engine as engine:
+            self.assertIsNotNone(engine._signal_flush_task)
+        self.exchange.load_markets.assert_awaited_once()
+        self.assertIsNone(self.engine._signal_flush_task)
+
+    async def test_status_updates_and_deletes_are_batched(self):
+        """已落库信号的状态更新与删除排队后在同一事务中写入"""
+        session = self._mock_db_session()
+        await self.engine.update_signal_status('a', 'executed')
+        await self.engine.remove_signal('b')
+        await self.engine.remove_signal('c')
+        session.execute.assert_not_awaited()
+        await self.engine.flush_signals()
+        self.assertEqual(session.execute.await_count, 2)
+        update_rows = session.execute.await_args_list[0].args[1]
+        delete_rows = session.execute.await_args_list[1].args[1]
+        self.assertEqual(update_rows, [{'signal_id': 'a', 'new_status': 'executed'}])
+        self.assertCountEqual(delete_rows, [{'signal_id': 'b'}, {'signal_id': 'c'}])
+        session.commit.assert_awaited_once()
+
+    async def test_daily_loss_alert_is_awaited(self):
+        """日亏损超限时报警被真正发出"""
+        self.engine.max_daily_loss = 5.0
+        await self.engine.update_daily_pnl(-3.0)
+        self.alert_system.trigger_alert.assert_not_awaited()
+        await self.engine.update_daily_pnl(-3.0)
+        self.alert_system.trigger_alert.assert_awaited_once()
+        self.assertEqual(self.engine.daily_trades, 2)
+
+    async def test_failed_flush_is_requeued(self):
+        """写入失败的批次放回缓冲区，不覆盖写入期间的更新操作"""
+        signal = {'symbol': 'BTC/USDT', 'timeframe': '1h', 'side': 'long', 'strength': 50}
+        session = self._mock_db_session()
+        async def locked(*args):
+            # 写入期间有新的操作进入缓冲区
+            await self.engine.update_signal_status('a', 'executed')
+            await self.engine.add_signal('b', {**signal, 'strength': 80})
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+        session.execute.side_effect = locked
+        await self.engine.add_signal('a', signal)
+        await self.engine.add_signal('b', signal)
+        await self.engine.remove_signal('c')
+        await self.engine.flush_signals()
+        self.assertEqual(self.engine._pending_signal_inserts['a']['status'], 'executed')
+        self.assertEqual(self.engine._pending_signal_inserts['b']['strength'], 80)
+        self.assertEqual(self.engine._pending_status_updates, {})
+        self.assertEqual(self.engine._pending_signal_deletes, {'c'})
+
+    async def test_failed_flush_is_dropped_after_retries(self):
+        """约束冲突立即丢弃并报警；临时错误超过重试上限后同样丢弃"""
+        signal = {'symbol': 'BTC/USDT', 'timeframe': '1h', 'side': 'long', 'strength': 50}
+        session = self._mock_db_session()
+        session.execute.side_effect = IntegrityError("INSERT", {}, Exception("NOT NULL constraint failed"))
+        await self.engine.add_signal('a', signal)
+        await self.engine.flush_signals()
+        self.assertEqual(self.engine._pending_signal_inserts, {})
+        self.assertEqual(self.alert_system.trigger_alert.await_args.kwargs['alert_type'], 'DATABASE_ERROR')
+
+        self.alert_system.trigger_alert.reset_mock()
+        session.execute.side_effect = OperationalError("INSERT", {}, Exception("database is locked"))
+        await self.engine.add_signal('b', signal)
+        for _ in range(self.engine.SIGNAL_FLUSH_MAX_RETRIES):
+            await self.engine.flush_signals()
+            self.assertIn('b', self.engine._pending_signal_inserts)
+        self.alert_system.trigger_alert.assert_not_awaited()
+        await self.engine.flush_signals()
+        self.assertEqual(self.engine._pending_signal_inserts, {})
+        self.alert_system.trigger_alert.assert_awaited_once()
+
+    def test_parse_symbol(self):
+        """交易对解析支持斜杠格式和无分隔符格式"""
+        self.assertEqual(self.engine._parse_symbol('BTC/USDT'), ('BTC', 'USDT'))
+        self.assertEqual(self.engine._parse_symbol('ETHBTC'), ('ETH', 'BTC'))
+        self.assertEqual(self.engine._parse_symbol('SOLUSDC'), ('SOL', 'USDC'))
+        self.assertEqual(self.engine._parse_symbol('UNKNOWN'), (None, None))
+
+    def test_parse_symbol_uses_markets(self):
+        """已加载的市场信息优先于字符串解析"""
+        self.exchange.markets = {'BTC/USDT:USDT': {'base': 'BTC', 'quote': 'USDT'}}
+        self.engine._index_market_symbols()
+        self.assertEqual(self.engine._parse_symbol('BTC/USDT:USDT'), ('BTC', 'USDT'))
+
+    async def test_check_balance_uses_order_side(self):
+        """买单检查计价币种余额，卖单检查基础币种余额"""
+        self.exchange.markets = {'BTC/USDT': {'contract': False}}
+        balance = {'USDT': {'free': 50.0}, 'BTC': {'free': 2.0}}
+        with self.assertRaises(ValueError):
+            await self.engine._check_balance('BTC/USDT', 1.0, 'buy', price=100.0, balance=balance)
+        await self.engine._check_balance('BTC/USDT', 1.0, 'sell', price=100.0, balance=balance)
+
+    async def test_check_balance_uses_margin_for_contracts(self):
+        """合约多空都按 名义价值 / 杠杆 检查结算币种保证金"""
+        self.exchange.markets = {'BTC/USDT': {'contract': True, 'settle': 'USDT'}}
+        balance = {'USDT': {'free': 50.0}}
+        for side in ('buy', 'sell'):
+            await self.engine._check_balance('BTC/USDT', 1.0, side, price=100.0, balance=balance, leverage=2.0)
+        with self.assertRaises(ValueError):
+            await self.engine._check_balance('BTC/USDT', 1.0, 'sell', price=100.0, balance=balance)
+
+if __name__ == "__main__":
+    unittest.main()
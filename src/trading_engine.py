@@ -1,22 +1,97 @@
 import logging
 import asyncio
 import time
-from typing import Optional, Dict, Any, List
+import random
+import heapq
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, List, Set, Tuple, Type
+import ccxt
 from ccxt.async_support import binance
-from sqlalchemy import select, insert, update, delete
+from sqlalchemy import select, insert, update, delete, bindparam
+from sqlalchemy.exc import OperationalError
 from src.config import CONFIG
 from src.alert_system import AlertSystem
 from src.database import db_pool, ResonanceSignal
 # --- 【核心】导入我们新的核心决策模块和工具函数 ---
 from src.ai.macro_analyzer import MacroAnalyzer
-from src.core_logic import get_allocation_percent, get_dynamic_risk_coefficient, calculate_target_position_value
+from src.core_logic import get_dynamic_risk_coefficient, calculate_target_position_value, LEVERAGE_MAP
 
 logger = logging.getLogger(__name__)
 
+# 时钟约定：需要持久化或展示的时间（信号 timestamp、last_reset_time）使用 time.time()；
+# 超时/缓存等间隔计算一律使用 time.monotonic()，不受系统时间校准（NTP 回拨）影响。
+
+# 无分隔符交易对（如 BTCUSDT）可识别的计价币种，按长度降序排列，先命中的即为最长匹配
+_KNOWN_QUOTES = tuple(sorted(('USDT', 'BUSD', 'USDC', 'BTC', 'ETH'), key=len, reverse=True))
+
+# 信号用 long/short 表示方向，币安下单接口只接受 BUY/SELL
+_ORDER_SIDES = {'long': 'buy', 'short': 'sell'}
+
+# 共振信号的增删改语句只构建一次，执行时通过参数绑定，复用 SQLAlchemy 的编译缓存；
+# 基于 Table 构建（Core 语句），可以直接以参数列表批量执行(executemany)
+_SIGNALS_TABLE = ResonanceSignal.__table__
+_UPSERT_SIGNALS = insert(_SIGNALS_TABLE).prefix_with("OR REPLACE", dialect="sqlite")
+_DELETE_SIGNAL = delete(_SIGNALS_TABLE).where(_SIGNALS_TABLE.c.id == bindparam('signal_id'))
+_UPDATE_SIGNAL_STATUS = (
+    update(_SIGNALS_TABLE)
+    .where(_SIGNALS_TABLE.c.id == bindparam('signal_id'))
+    .values(status=bindparam('new_status'))
+)
+
+@dataclass
+class RetryPolicy:
+    """交易所调用的重试策略（指数退避 + 随机抖动）"""
+    # 下单处于关键路径上，退避从 0.1 秒起步、封顶 2 秒；交易所长时间不可用由熔断器处理
+    initial_delay: float = 0.1
+    max_delay: float = 2.0
+    exponential_base: float = 2.0
+    jitter: bool = True
+    # ccxt 中网络类异常（超时、限流、交易所不可用）都继承自 NetworkError，
+    # 资金不足、无效订单、认证失败等属于永久性错误，重试没有意义
+    retryable_exceptions: Tuple[Type[Exception], ...] = (ccxt.NetworkError,)
+
+    def get_delay(self, attempt: int) -> float:
+        # 数据流长时间断线时 attempt 会持续增长，限制指数防止浮点溢出
+        delay = self.initial_delay * self.exponential_base ** min(attempt, 64)
+        if self.jitter:
+            delay *= 0.5 + random.random()
+        # 抖动之后再封顶，保证等待时间不超过 max_delay
+        return min(delay, self.max_delay)
+
+@dataclass(slots=True)
+class Order:
+    """活跃订单记录"""
+    symbol: str
+    type: str
+    side: str
+    amount: float
+    price: Optional[float]
+    status: str
+    filled: float
+    timestamp: float  # 下单时的墙上时间
+    mono_ts: float    # 下单时的单调时钟时间，用于超时判断
+
 class TradingEngine:
     """交易引擎核心类 (已适配最终版宏观系统)"""
     
     ORDER_CHECK_INTERVAL = 1
+    RETRY_POLICY = RetryPolicy()
+    # WebSocket 数据流断线重连的退避策略：交易所长时间不可用时重连间隔放宽到 60 秒
+    RECONNECT_POLICY = RetryPolicy(initial_delay=1.0, max_delay=60.0)
+    TICKER_CACHE_TTL = 0.5
+    PRICE_STREAM_TTL = 3.0  # 行情由 WebSocket 推送时允许的最大数据年龄（币安 ticker 约每秒推送一次）
+    MAX_PRICE_STREAMS = 10  # 同时订阅行情推送的交易对上限，超出时关闭最久未交易的订阅
+    BALANCE_CACHE_TTL = 2.0
+    POSITION_CACHE_TTL = 0.5
+    SIGNAL_FLUSH_INTERVAL = 0.1
+    SIGNAL_FLUSH_BATCH = 50
+    SIGNAL_FLUSH_MAX_RETRIES = 10  # 数据库临时错误（如被锁）时连续重试写入的次数上限
+    SIGNAL_LOAD_LIMIT = 10_000  # 启动时最多加载的信号数，防止异常数据撑爆内存
+    BREAKER_THRESHOLD = 5   # 连续失败多少次后熔断交易所调用
+    BREAKER_COOLDOWN = 30.0  # 熔断后多少秒内直接拒绝调用
+    MAX_CONCURRENT_MONITORS = 64  # 同时运行的订单监控任务上限
+    RECENT_TERMINAL_ORDERS = 256  # 记录的未跟踪订单终态推送数量上限
     
     # --- 【核心修改】构造函数现在接收一个 MacroAnalyzer 实例 ---
     def __init__(self, exchange: binance, alert_system: AlertSystem, macro_analyzer: MacroAnalyzer):
@@ -24,12 +99,13 @@ class TradingEngine:
         self.alert_system = alert_system
         self.macro_analyzer = macro_analyzer # 直接使用外部传入的实例
         
-        self.active_orders: Dict[str, Dict] = {}
+        self.active_orders: Dict[str, Order] = {}
         self.order_timeout = CONFIG.alert_order_timeout
         self.slippage_threshold = CONFIG.alert_slippage_threshold
         self.min_partial_fill = CONFIG.alert_min_partial_fill
         self.max_daily_loss = CONFIG.alert_max_daily_loss
         self.api_retry_count = CONFIG.alert_api_retry_count
+        self._quote_currency = CONFIG.quote_currency  # 账户权益的计价币种
         
         self.daily_pnl = 0.0
         self.daily_trades = 0
@@ -37,17 +113,81 @@ class TradingEngine:
         
         self.resonance_pool: Dict[str, Dict] = {}
         self.signal_timeout = CONFIG.macro_cache_timeout
+        # (过期时间, 信号ID) 最小堆，过期检查只需查看堆顶
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # 状态为 pending 的信号数量，随增删改增量维护，查询时无需遍历共振池
+        self._pending_count = 0
+        # 新信号的数据库写入缓冲区（按信号ID去重），由后台任务批量落库
+        self._pending_signal_inserts: Dict[str, Dict[str, Any]] = {}
+        # 状态更新与删除同样先进入缓冲区，与新信号在同一个事务中落库
+        self._pending_status_updates: Dict[str, str] = {}
+        self._pending_signal_deletes: Set[str] = set()
+        self._signal_flush_event = asyncio.Event()
+        self._signal_db_lock = asyncio.Lock()
+        self._signal_flush_task: Optional[asyncio.Task] = None
+        # 关闭时置位，让后台写入任务完成当前一轮后自行退出，而不是在写入中途被取消
+        self._signal_flush_closing = False
+        self._signal_flush_failures = 0  # 连续写入失败次数，成功后清零
+
+        # 订单状态优先通过交易所 WebSocket 用户数据流更新，数据流不可用时才回退到 REST 轮询；
+        # 两种方式都由同一个后台任务集中处理，单个订单的监控任务只等待终态事件或超时
+        self._order_update_task: Optional[asyncio.Task] = None
+        self._order_stream_healthy = False
+        # 每个活跃订单一个事件，数据流推送终态时唤醒对应的监控任务
+        self._order_events: Dict[str, asyncio.Event] = {}
+        # 下单请求返回前就到达的终态推送（订单ID -> 状态），下单返回后据此跳过跟踪
+        self._recent_terminal_orders: "OrderedDict[str, str]" = OrderedDict()
+        # 余额同样订阅推送：数据流正常时余额缓存不过期，下单无需再请求 fetch_balance
+        self._balance_stream_task: Optional[asyncio.Task] = None
+        self._balance_stream_healthy = False
+        # 订单监控任务集合：持有引用防止被回收，关闭时统一等待
+        self._monitor_tasks: Set[asyncio.Task] = set()
+        self._monitor_sem = asyncio.Semaphore(self.MAX_CONCURRENT_MONITORS)
+        
+        # 行情/余额短时缓存，避免同一笔交易决策中重复请求交易所
+        # 以下缓存均为进程内缓存：服务以单 worker 运行（见 Dockerfile），且 SQLite 与
+        # 共振池本身也不支持多进程共享；若改为多进程部署，需要换成共享缓存（如 Redis）
+        self._ticker_cache: Dict[str, Tuple[float, Dict]] = {}
+        # 正在进行中的行情请求，同一交易对的并发调用共享同一个请求
+        self._ticker_inflight: Dict[str, asyncio.Task] = {}
+        # 按最近交易时间排序的行情订阅任务（LRU），推送结果直接写入 _ticker_cache
+        self._price_streams: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+        self._balance_cache: Optional[Tuple[float, Dict]] = None
+        self._balance_lock = asyncio.Lock()
+        self._position_cache: Dict[str, Tuple[float, Dict]] = {}
+        self._symbol_parse_cache: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+
+        # 交易所调用熔断器：closed 正常 / open 拒绝调用 / half_open 冷却结束后试探
+        # probing 表示半开状态下已有一个试探调用在进行，其余调用继续被拒绝
+        self._breaker = {'state': 'closed', 'failures': 0, 'opened_at': 0.0, 'probing': False}
+        
+        # 宏观决策按小时级别变化，缓存 macro_cache_timeout 秒，避免每笔订单都请求 AI
+        self._macro_decision_cache: Optional[Dict[str, Any]] = None
+        self._macro_decision_ts: float = 0.0
+        self._macro_decision_rows: int = -1
+        self._macro_lock = asyncio.Lock()
 
     async def initialize(self) -> None:
         """(此方法保持不变)"""
         logger.info("正在初始化交易引擎...")
+        self._index_market_symbols()
         await self._load_resonance_pool_from_db()
+        self._signal_flush_task = asyncio.create_task(self._signal_flush_loop())
+        if self.exchange.has.get('watchOrders') is True:
+            self._order_stream_healthy = True
+            self._order_update_task = asyncio.create_task(self._order_stream_loop())
+        else:
+            self._order_update_task = asyncio.create_task(self._order_poll_loop())
+        if self.exchange.has.get('watchBalance') is True:
+            self._balance_stream_task = asyncio.create_task(self._balance_stream_loop())
         logger.info("✅ 交易引擎初始化完成")
 
     # --- 【核心修改】execute_order 被彻底重写 ---
-    async def execute_order(self, signal_data: Dict[str, Any], account_equity: float, current_drawdown: float) -> Optional[Dict[str, Any]]:
+    async def execute_order(self, signal_data: Dict[str, Any], account_equity: Optional[float] = None,
+                            current_drawdown: float = 0.0) -> Optional[Dict[str, Any]]:
         """
         执行交易决策的统一入口。
+        未传入 account_equity 时，从交易所余额中读取 USDT 总权益。
         """
         try:
             # 1. 从信号中解析基础信息
@@ -58,9 +198,22 @@ class TradingEngine:
             if not all([strategy_id, symbol, action]):
                 logger.error(f"接收到无效信号，缺少关键字段: {signal_data}")
                 return None
+            side = _ORDER_SIDES.get(action.lower())
+            if side is None:
+                logger.error(f"接收到无效信号，未知的交易方向: {signal_data}")
+                return None
+
+            self._ensure_price_stream(symbol)
 
-            # 2. 获取最终的宏观决策
-            macro_decision = await self.macro_analyzer.get_macro_decision()
+            # 2. 并发获取宏观决策、最新行情和账户余额（三者互不依赖）
+            pending = [self._get_cached_macro_decision(), self._get_cached_ticker(symbol)]
+            if account_equity is None:
+                pending.append(self._get_cached_balance())
+            results = await asyncio.gather(*pending, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+            macro_decision, ticker = results[0], results[1]
             macro_status = macro_decision.get("market_season", "OSC")
             
             # 3. 方向性过滤
@@ -68,43 +221,56 @@ class TradingEngine:
             signal_dir = 1 if action.lower() == 'long' else -1 if action.lower() == 'short' else 0
             
             if market_dir != 0 and market_dir != signal_dir:  # 修正方向过滤逻辑
-                logger.info(f"信号被过滤: 策略 {strategy_id} 的 {action} 信号与宏观主方向({macro_status})不符。")
+                logger.info("信号被过滤: 策略 %s 的 %s 信号与宏观主方向(%s)不符。", strategy_id, action, macro_status)
                 return None
 
-            # 4. 获取所有需要的系数来计算仓位
-            allocation_percent = get_allocation_percent(macro_status, symbol)
+            # 账户余额每笔订单只获取一次，权益计算与下单前的余额检查共用同一份数据
+            account_balance = None
+            if account_equity is None:
+                account_balance = results[2]
+                try:
+                    account_equity = float(account_balance['total'][self._quote_currency])
+                except KeyError:
+                    account_equity = 0.0
+
+            # 4. 计算仓位 (分配比例与风险系数在 core_logic 中按参数缓存)
+            # MacroAnalyzer 只返回 market_season，仓位计算需要的状态与杠杆在此补齐
+            sizing_decision = {
+                'macro_status': macro_status,
+                'base_leverage': LEVERAGE_MAP.get(macro_status, 1.0),
+                **macro_decision
+            }
             dynamic_risk_coeff = get_dynamic_risk_coefficient(current_drawdown)
-            
-            # 重新引入共振系统
-            resonance_multiplier = await self.get_resonance_decision(symbol)
-            
-            # 5. 调用core_logic中的函数，计算最终仓位价值
             position_details = calculate_target_position_value(
                 account_equity=account_equity,
-                allocation_percent=allocation_percent,
-                macro_decision=macro_decision,
-                resonance_multiplier=resonance_multiplier,
-                dynamic_risk_coeff=dynamic_risk_coeff,
-                confidence_weight=1.0 # 简化
+                symbol=symbol,
+                macro_decision=sizing_decision,
+                dynamic_risk_coeff=dynamic_risk_coeff
             )
             
             target_value = position_details.get("target_position_value", 0.0)
             if target_value <= 0:
-                logger.info(f"计算出的目标仓位为0 ({strategy_id})，不执行交易。")
+                logger.info("计算出的目标仓位为0 (%s)，不执行交易。", strategy_id)
                 return None
 
-            # 6. 执行下单
-            logger.info(f"准备执行订单: {strategy_id} - {action} {symbol}，目标价值: ${target_value:,.2f}")
+            # 5. 执行下单
+            logger.info("准备执行订单: %s - %s %s，目标价值: $%.2f", strategy_id, action, symbol, target_value)
             
-            current_price = (await self.exchange.fetch_ticker(symbol))['last']
+            current_price = ticker['last']
             amount = target_value / current_price
             
             # 增加订单参数合规性检查
             if amount < self.exchange.markets[symbol]['limits']['amount']['min']:
-                logger.warning(f"下单数量 {amount} 小于交易所最小限制，订单取消")
+                logger.warning("下单数量 %s 小于交易所最小限制，订单取消", amount)
                 return None
             
-            order_params = {'symbol': symbol, 'type': 'market', 'side': action, 'amount': amount}
+            try:
+                await self._check_balance(symbol, amount, side, current_price, balance=account_balance,
+                                          leverage=sizing_decision['base_leverage'])
+            except Exception:
+                return None  # _check_balance 已记录日志并报警
+
+            order_params = {'symbol': symbol, 'type': 'market', 'side': side, 'amount': amount}
             order_result = await self._execute_with_retry(
                 lambda: self.exchange.create_order(**order_params)
             )
@@ -113,12 +279,29 @@ class TradingEngine:
                 logger.error("订单创建失败")
                 return None
             
-            self.active_orders[order_result['id']] = {
-                'symbol': symbol, 'type': 'market', 'side': action, 'amount': amount,
-                'price': current_price, 'status': order_result['status'],
-                'filled': order_result.get('filled', 0), 'timestamp': time.time()
-            }
-            asyncio.create_task(self._monitor_order(order_result['id']))
+            # 下单后的收尾工作都是同步操作或后台任务，create_order 是关键路径上唯一的等待；
+            # 成交会改变余额和持仓，让短时缓存失效，下一笔信号重新读取（余额推送正常时由推送更新）
+            if not self._balance_stream_healthy:
+                self._balance_cache = None
+            self._position_cache.pop(symbol, None)
+            
+            # 市价单通常在下单返回时已成交，数据流的终态推送可能先于此处到达，无需再跟踪
+            if order_result['status'] in ('closed', 'canceled', 'expired'):
+                return order_result
+            # 终态推送可能先于下单返回到达，此时订单尚未登记，推送已被记录下来
+            if self._recent_terminal_orders.pop(order_result['id'], None) is not None:
+                return order_result
+            
+            self.active_orders[order_result['id']] = Order(
+                symbol=symbol, type='market', side=side, amount=amount,
+                price=current_price, status=order_result['status'],
+                filled=order_result.get('filled', 0), timestamp=time.time(),
+                mono_ts=time.monotonic()
+            )
+            self._order_events[order_result['id']] = asyncio.Event()
+            task = asyncio.create_task(self._monitor_order_bounded(order_result['id']))
+            self._monitor_tasks.add(task)
+            task.add_done_callback(self._monitor_tasks.discard)
             
             return order_result
 
@@ -131,126 +314,385 @@ class TradingEngine:
     
     # --- 以下方法根据需要进行修改 ---
     
+    async def _monitor_order_bounded(self, order_id: str):
+        """限制并发监控数量，突发下单时多余的监控任务排队等待"""
+        async with self._monitor_sem:
+            await self._monitor_order(order_id)
+
     async def _monitor_order(self, order_id: str):
-        """实现订单监控逻辑"""
+        """等待订单的终态事件；超过 order_timeout 仍未结束则报警并撤单"""
+        event = self._order_events.setdefault(order_id, asyncio.Event())
         try:
-            while True:
-                order_info = await self.exchange.fetch_order(order_id)
-                status = order_info['status']
-                
-                if status in ['closed', 'canceled', 'expired']:
-                    # 订单已完成，从active_orders中移除
-                    if order_id in self.active_orders:
-                        del self.active_orders[order_id]
-                    break
-                
-                # 检查订单超时
-                if time.time() - self.active_orders[order_id]['timestamp'] > self.order_timeout:
-                    await self.cancel_order(order_id)
-                    break
-                
-                await asyncio.sleep(self.ORDER_CHECK_INTERVAL)
-                
+            order = self.active_orders.get(order_id)
+            if order is None:
+                return  # 已处理为终态
+            remaining = self.order_timeout - (time.monotonic() - order.mono_ts)
+            try:
+                await asyncio.wait_for(event.wait(), timeout=max(remaining, 0))
+            except asyncio.TimeoutError:
+                if order_id in self.active_orders:
+                    if await self.cancel_order(order_id, order.symbol):
+                        result = "已撤单"
+                    else:
+                        # 撤单失败时订单仍留在 active_orders 中，由订单数据流/轮询继续跟踪其状态
+                        result = "撤单失败，继续跟踪订单状态"
+                    logger.warning("订单 %s (%s) 超时，%s", order_id, order.symbol, result)
+                    # 未配置报警 Webhook 时 alert_system 为 None
+                    if self.alert_system:
+                        await self.alert_system.trigger_alert(
+                            alert_type="ORDER_TIMEOUT",
+                            message=f"订单 {order_id} ({order.symbol}) 超过 {self.order_timeout} 秒未完成，{result}",
+                            level="warning"
+                        )
         except Exception as e:
             logger.error(f"监控订单 {order_id} 失败: {e}")
             if order_id in self.active_orders:
                 del self.active_orders[order_id]
+        finally:
+            self._order_events.pop(order_id, None)
+
+    def _apply_order_update(self, order_info: Dict[str, Any]) -> bool:
+        """将交易所推送或查询到的订单状态写入 active_orders，返回订单是否已结束"""
+        order_id = order_info.get('id')
+        order = self.active_orders.get(order_id)
+        status = order_info.get('status')
+        if order is None:
+            if order_id and status in ('closed', 'canceled', 'expired'):
+                self._recent_terminal_orders[order_id] = status
+                if len(self._recent_terminal_orders) > self.RECENT_TERMINAL_ORDERS:
+                    self._recent_terminal_orders.popitem(last=False)
+            return True
+        if status in ('closed', 'canceled', 'expired'):
+            # 订单已完成，从active_orders中移除并唤醒监控任务
+            del self.active_orders[order_id]
+            event = self._order_events.get(order_id)
+            if event:
+                event.set()
+            return True
+        if status:
+            order.status = status
+        if order_info.get('filled') is not None:
+            order.filled = order_info['filled']
+        return False
+
+    async def _order_stream_loop(self) -> None:
+        """订阅用户数据流中的订单更新，所有活跃订单共用一个 WebSocket 连接"""
+        attempt = 0
+        while True:
+            try:
+                orders = await self.exchange.watch_orders()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 断线期间每次重连前用 REST 查询一遍活跃订单
+                self._order_stream_healthy = False
+                delay = self.RECONNECT_POLICY.get_delay(attempt)
+                attempt += 1
+                logger.warning("订单数据流断开，%.2f秒后重连: %s", delay, e)
+                await self._reconcile_active_orders()
+                await asyncio.sleep(delay)
+                continue
+            recovered = not self._order_stream_healthy
+            self._order_stream_healthy = True
+            attempt = 0
+            for order_info in orders:
+                self._apply_order_update(order_info)
+            if recovered:
+                # 断线期间的推送不会重放，重连后用 REST 对账一次
+                await self._reconcile_active_orders()
+
+    async def _order_poll_loop(self) -> None:
+        """交易所不支持订单数据流时，每 ORDER_CHECK_INTERVAL 秒集中查询一次所有活跃订单"""
+        while True:
+            if self.active_orders:
+                await self._reconcile_active_orders()
+            await asyncio.sleep(self.ORDER_CHECK_INTERVAL)
+
+    async def _reconcile_active_orders(self) -> None:
+        """逐个查询活跃订单的最新状态"""
+        for order_id, order in list(self.active_orders.items()):
+            try:
+                self._apply_order_update(await self.exchange.fetch_order(order_id, order.symbol))
+            except Exception as e:
+                logger.warning("订单 %s 对账失败: %s", order_id, e)
     
-    async def get_resonance_decision(self, symbol: str) -> float:
-        """获取当前交易对的共振系数"""
-        try:
-            # 获取该交易对的所有活跃信号
-            symbol_signals = [
-                signal for signal in self.resonance_pool.values()
-                if signal['symbol'] == symbol and signal['status'] == 'pending'
-            ]
-            
-            if not symbol_signals:
-                return 1.0
-            
-            # 计算共振系数
-            total_strength = sum(signal['strength'] for signal in symbol_signals)
-            avg_strength = total_strength / len(symbol_signals)
-            
-            # 将强度映射到0.5-1.5的系数范围
-            return 0.5 + (avg_strength / 100)
-            
-        except Exception as e:
-            logger.error(f"计算共振系数失败: {e}")
-            return 1.0
+    async def get_macro_decision(self) -> Dict[str, Any]:
+        """对外提供与下单共用的宏观决策缓存（如 Discord 面板）"""
+        return await self._get_cached_macro_decision()
+
+    async def _get_cached_macro_decision(self) -> Dict[str, Any]:
+        """获取宏观决策（TTL 缓存；因子数据有更新时立即刷新）"""
+        async with self._macro_lock:
+            factor_rows = len(getattr(self.macro_analyzer, 'factor_history', ()))
+            if (self._macro_decision_cache is not None
+                    and factor_rows == self._macro_decision_rows
+                    and time.monotonic() - self._macro_decision_ts < CONFIG.macro_cache_timeout):
+                return self._macro_decision_cache
+            decision = await self.macro_analyzer.get_macro_decision()
+            self._macro_decision_cache = decision
+            self._macro_decision_ts = time.monotonic()
+            self._macro_decision_rows = factor_rows
+            return decision
     
-    # --- (以下所有方法保持原样) ---
+    async def _get_cached_ticker(self, symbol: str, ttl: Optional[float] = None) -> Dict:
+        """获取行情（短时缓存）"""
+        ttl = self.TICKER_CACHE_TTL if ttl is None else ttl
+        if symbol in self._price_streams:
+            ttl = max(ttl, self.PRICE_STREAM_TTL)
+        cached = self._ticker_cache.get(symbol)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        task = self._ticker_inflight.get(symbol)
+        if task is None:
+            task = asyncio.create_task(self._fetch_ticker(symbol))
+            self._ticker_inflight[symbol] = task
+            task.add_done_callback(lambda _: self._ticker_inflight.pop(symbol, None))
+        # shield：某个等待方被取消时不影响其他共享该请求的协程
+        return await asyncio.shield(task)
+
+    def _ensure_price_stream(self, symbol: str) -> None:
+        """为交易过的交易对订阅行情推送，下单时直接读取本地价格，未推送时回退到 REST"""
+        if self.exchange.has.get('watchTicker') is not True:
+            return
+        if symbol in self._price_streams:
+            self._price_streams.move_to_end(symbol)
+            return
+        self._price_streams[symbol] = asyncio.create_task(self._price_stream_loop(symbol))
+        while len(self._price_streams) > self.MAX_PRICE_STREAMS:
+            _, task = self._price_streams.popitem(last=False)
+            task.cancel()
+
+    async def _price_stream_loop(self, symbol: str) -> None:
+        attempt = 0
+        while True:
+            try:
+                ticker = await self.exchange.watch_ticker(symbol)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 断线期间缓存过期，_get_cached_ticker 自动回退到 REST
+                delay = self.RECONNECT_POLICY.get_delay(attempt)
+                attempt += 1
+                logger.warning("%s 行情推送断开，%.2f秒后重连: %s", symbol, delay, e)
+                await asyncio.sleep(delay)
+                continue
+            attempt = 0
+            self._ticker_cache[symbol] = (time.monotonic(), ticker)
+
+    async def _fetch_ticker(self, symbol: str) -> Dict:
+        ticker = await self.exchange.fetch_ticker(symbol)
+        self._ticker_cache[symbol] = (time.monotonic(), ticker)
+        return ticker
     
-    async def _check_balance(self, symbol: str, amount: float, price: Optional[float] = None):
-        try:
+    async def _get_cached_balance(self, ttl: Optional[float] = None) -> Dict:
+        """获取账户余额（短时缓存，并发调用合并为一次请求）"""
+        ttl = self.BALANCE_CACHE_TTL if ttl is None else ttl
+        async with self._balance_lock:
+            if self._balance_cache and (self._balance_stream_healthy
+                                        or time.monotonic() - self._balance_cache[0] < ttl):
+                return self._balance_cache[1]
             balance = await self.exchange.fetch_balance()
-            base_currency, quote_currency = None, None
+            self._balance_cache = (time.monotonic(), balance)
+            return balance
+    
+    async def _balance_stream_loop(self) -> None:
+        """订阅账户余额推送，持续刷新余额缓存"""
+        attempt = 0
+        while True:
+            try:
+                balance = await self.exchange.watch_balance()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 断线期间余额缓存按 BALANCE_CACHE_TTL 过期，回退到 REST 查询
+                self._balance_stream_healthy = False
+                delay = self.RECONNECT_POLICY.get_delay(attempt)
+                attempt += 1
+                logger.warning("余额推送断开，%.2f秒后重连: %s", delay, e)
+                await asyncio.sleep(delay)
+                continue
+            attempt = 0
+            self._balance_cache = (time.monotonic(), balance)
+            self._balance_stream_healthy = True
+    
+    # --- (以下所有方法保持原样) ---
+    
+    def _index_market_symbols(self) -> None:
+        """用已加载的市场信息预填交易对解析缓存（含 BTC/USDT:USDT 这类合约符号）"""
+        markets = self.exchange.markets
+        if not isinstance(markets, dict):
+            return
+        for market_symbol, market in markets.items():
+            base, quote = market.get('base'), market.get('quote')
+            if base and quote:
+                self._symbol_parse_cache[market_symbol] = (base, quote)
+
+    def _parse_symbol(self, symbol: str) -> Tuple[Optional[str], Optional[str]]:
+        """解析交易对的基础币种和计价币种（优先使用市场信息，未知交易对按规则解析后缓存）"""
+        parts = self._symbol_parse_cache.get(symbol)
+        if parts is None:
             if '/' in symbol:
                 base_currency, quote_currency = symbol.split('/')
+                parts = (base_currency, quote_currency)
             else:
-                known_quotes = ['USDT', 'BUSD', 'USDC', 'BTC', 'ETH']
-                for quote in known_quotes:
-                    if symbol.endswith(quote):
-                        base_currency = symbol[:-len(quote)]
-                        quote_currency = quote
-                        break
+                parts = (None, None)
+                # endswith 接受元组，一次 C 层调用即可判断是否有已知计价币种
+                if symbol.endswith(_KNOWN_QUOTES):
+                    quote_currency = next(q for q in _KNOWN_QUOTES if symbol.endswith(q))
+                    base_currency = symbol[:-len(quote_currency)]
+                    if base_currency:
+                        parts = (base_currency, quote_currency)
+            self._symbol_parse_cache[symbol] = parts
+        return parts
+    
+    async def _check_balance(self, symbol: str, amount: float, side: str, price: Optional[float] = None,
+                             balance: Optional[Dict] = None, leverage: float = 1.0):
+        """下单前检查可用余额：合约按保证金（名义价值 / 杠杆）检查结算币种，现货卖单检查基础币种"""
+        try:
+            if balance is None:
+                balance = await self._get_cached_balance()
+            base_currency, quote_currency = self._parse_symbol(symbol)
             if not base_currency: raise ValueError(f"无法解析交易对: {symbol}")
-            is_buy = 'buy' in self.active_orders.get(symbol, {}).get('side', 'buy').lower()
-            if price is not None:
+            is_buy = side.lower() in ('buy', 'long')
+            try:
+                # 与 create_order 相同的解析：defaultType 为 future 时 BTC/USDT 对应 USDT 本位合约
+                market = self.exchange.market(symbol)
+            except Exception:
+                market = None
+            if market and market.get('contract') and price is not None:
+                # 合约开多开空都只占用结算币种的保证金
+                required_amount = amount * price / max(leverage, 1.0)
+                currency = market.get('settle') or quote_currency
+            elif price is not None:
                 required_amount = amount * price if is_buy else amount
                 currency = quote_currency if is_buy else base_currency
             else:
                 currency = quote_currency if is_buy else base_currency
                 required_amount = amount
-            available = balance.get(currency, {}).get('free', 0)
+            try:
+                available = balance[currency]['free']
+            except KeyError:
+                available = 0
             if float(available) < required_amount:
                 raise ValueError(f"资金不足: 需要 {required_amount} {currency}, 可用 {available}")
         except Exception as e:
             logger.error(f"检查余额失败: {e}")
-            await self.alert_system.trigger_alert(
-                alert_type="INSUFFICIENT_FUNDS", message=f"检查余额失败: {e}", level="warning"
-            )
+            if self.alert_system:
+                await self.alert_system.trigger_alert(
+                    alert_type="INSUFFICIENT_FUNDS", message=f"检查余额失败: {e}", level="warning"
+                )
             raise
     
-    async def _execute_with_retry(self, func, max_retries: int = 3) -> Any:
-        last_error = None
+    async def _execute_with_retry(self, func, max_retries: int = 3, policy: Optional[RetryPolicy] = None) -> Any:
+        policy = policy or self.RETRY_POLICY
         for i in range(max_retries):
+            is_probe = self._check_breaker()
             try:
-                return await func()
-            except Exception as e:
-                last_error = e
-                if i < max_retries - 1:
-                    await asyncio.sleep(1 * (i + 1))
-                    continue
-        raise last_error
+                result = await func()
+            except policy.retryable_exceptions as e:
+                await self._record_breaker_failure(e)
+                # 本次失败触发熔断时立即抛出，不再等待退避
+                if i >= max_retries - 1 or self._breaker['state'] == 'open':
+                    raise
+                delay = policy.get_delay(i)
+                logger.warning("交易所调用失败 (尝试 %d/%d)，%.2f秒后重试: %s", i + 1, max_retries, delay, e)
+                await asyncio.sleep(delay)
+            except BaseException:
+                # 非网络类异常说明交易所可达，但不能判定恢复；释放试探名额，下一个调用继续试探
+                if is_probe:
+                    self._breaker['probing'] = False
+                raise
+            else:
+                self._record_breaker_success()
+                return result
+
+    def _check_breaker(self) -> bool:
+        """熔断期间直接抛出 ExchangeNotAvailable，不再消耗重试次数；返回本次调用是否为半开状态下的试探调用"""
+        breaker = self._breaker
+        if breaker['state'] == 'closed':
+            return False
+        if breaker['state'] == 'open':
+            if time.monotonic() - breaker['opened_at'] < self.BREAKER_COOLDOWN:
+                raise ccxt.ExchangeNotAvailable("交易所调用已熔断，等待冷却")
+            breaker['state'] = 'half_open'
+            logger.info("熔断冷却结束，尝试恢复交易所调用")
+        # 半开状态只放行一个试探调用，试探结果出来之前其余调用仍被拒绝
+        if breaker['probing']:
+            raise ccxt.ExchangeNotAvailable("交易所调用已熔断，等待试探结果")
+        breaker['probing'] = True
+        return True
+
+    async def _record_breaker_failure(self, error: Exception) -> None:
+        breaker = self._breaker
+        breaker['failures'] += 1
+        breaker['probing'] = False
+        if breaker['state'] == 'open':
+            return
+        # 试探调用失败立即重新熔断；正常状态下连续失败达到阈值才熔断
+        if breaker['state'] == 'half_open' or breaker['failures'] >= self.BREAKER_THRESHOLD:
+            breaker['state'] = 'open'
+            breaker['opened_at'] = time.monotonic()
+            logger.error(f"交易所连续 {breaker['failures']} 次调用失败，熔断 {self.BREAKER_COOLDOWN:.0f} 秒: {error}")
+            # 仅在状态切换时报警一次，避免报警风暴
+            if self.alert_system:
+                await self.alert_system.trigger_alert(
+                    alert_type="EXCHANGE_ERROR",
+                    message=f"交易所调用连续失败，已熔断 {self.BREAKER_COOLDOWN:.0f} 秒: {error}",
+                    level="error"
+                )
+
+    def _record_breaker_success(self) -> None:
+        breaker = self._breaker
+        if breaker['state'] == 'half_open':
+            logger.info("交易所调用已恢复，熔断器关闭")
+        breaker['state'] = 'closed'
+        breaker['failures'] = 0
+        breaker['probing'] = False
     
-    async def cancel_order(self, order_id: str) -> bool:
+    async def cancel_order(self, order_id: str, symbol: Optional[str] = None) -> bool:
+        """撤单；币安撤单必须提供交易对，未传入时从活跃订单中查找"""
+        if symbol is None:
+            order = self.active_orders.get(order_id)
+            symbol = order.symbol if order else None
         try:
-            await self.exchange.cancel_order(order_id)
-            if order_id in self.active_orders:
-                self.active_orders[order_id]['status'] = 'canceled'
+            await self.exchange.cancel_order(order_id, symbol)
+            # 交易所已确认撤单，订单进入终态
+            self.active_orders.pop(order_id, None)
             return True
         except Exception as e:
             logger.error(f"取消订单失败: {e}")
             return False
     
     async def get_position(self, symbol: str) -> Dict[str, Any]:
+        """查询持仓；symbol 为 "*" 时返回全部持仓，否则只返回该交易对的持仓（短时缓存）"""
+        cached = self._position_cache.get(symbol)
+        if cached and time.monotonic() - cached[0] < self.POSITION_CACHE_TTL:
+            return cached[1]
         try:
-            all_positions = await self.exchange.fetch_positions()
-            positions_dict = {p['symbol']: p for p in all_positions}
             if symbol == "*":
-                return positions_dict
+                all_positions = await self.exchange.fetch_positions()
+                result = {p['symbol']: p for p in all_positions}
             else:
-                return {symbol: positions_dict.get(symbol)} if symbol in positions_dict else {}
+                # ccxt 对币安的 symbols 参数是在客户端过滤的，请求仍会拉取全部持仓；
+                # 真正减少请求的是上面的短时缓存
+                positions = await self.exchange.fetch_positions([symbol])
+                # 双向持仓模式下同一交易对有多空两条记录，优先返回有持仓数量的一条
+                position = next((p for p in positions if p.get('contracts')), None)
+                if position is None and positions:
+                    position = positions[0]
+                result = {symbol: position} if position else {}
         except Exception as e:
             logger.error(f"获取持仓失败: {e}")
             return {}
+        self._position_cache[symbol] = (time.monotonic(), result)
+        return result
     
-    def update_daily_pnl(self, pnl: float):
+    async def update_daily_pnl(self, pnl: float):
+        # 计数在 await 之前同步完成，单线程事件循环内不会被其他协程打断，无需加锁
         self.daily_pnl += pnl
         self.daily_trades += 1
         if abs(self.daily_pnl) > self.max_daily_loss:
-            self.alert_system.trigger_alert(
+            await self.alert_system.trigger_alert(
                 alert_type="DAILY_LOSS_LIMIT",
                 message=f"日亏损达到限制: {self.daily_pnl:.2f}%",
                 level="emergency"
@@ -274,7 +716,7 @@ class TradingEngine:
             return False
     
     def get_active_orders(self) -> Dict[str, Dict]:
-        return self.active_orders
+        return {order_id: asdict(order) for order_id, order in self.active_orders.items()}
     
     def get_daily_stats(self) -> Dict[str, Any]:
         return {
@@ -284,74 +726,244 @@ class TradingEngine:
         }
     
     async def add_signal(self, signal_id: str, signal_data: Dict[str, Any]) -> None:
-        self.resonance_pool[signal_id] = {**signal_data, 'timestamp': time.time(), 'status': 'pending'}
+        """信号写入内存共振池，数据库写入由后台任务批量完成"""
+        mono_ts = time.monotonic()
+        # 按固定字段直接构建，与从数据库加载的条目结构一致，不复制信号中的其他字段；
+        # 先读取并校验字段，无效信号在修改任何状态之前被拒绝，也不会进入写入缓冲区
         try:
-            async with db_pool.get_session() as session:
-                stmt = insert(ResonanceSignal).values(
-                    id=signal_id, symbol=signal_data['symbol'], timeframe=signal_data['timeframe'],
-                    side=signal_data['side'], strength=signal_data['strength'],
-                    timestamp=self.resonance_pool[signal_id]['timestamp'], status='pending'
-                )
-                await session.execute(stmt)
-                await session.commit()
-        except Exception as e:
-            logger.error(f"保存信号到数据库失败: {e}", exc_info=True)
+            symbol, timeframe = signal_data['symbol'], signal_data['timeframe']
+            side, strength = signal_data['side'], float(signal_data['strength'])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"无效信号 {signal_id}: {e!r}") from e
+        if not all(isinstance(value, str) and value for value in (symbol, timeframe, side)):
+            raise ValueError(f"无效信号 {signal_id}: symbol/timeframe/side 必须为非空字符串")
+        timestamp = time.time()
+        previous = self.resonance_pool.get(signal_id)
+        if previous is None or previous['status'] != 'pending':
+            self._pending_count += 1
+        self.resonance_pool[signal_id] = {
+            'symbol': symbol, 'timeframe': timeframe, 'side': side, 'strength': strength,
+            'timestamp': timestamp, 'mono_ts': mono_ts, 'status': 'pending'
+        }
+        heapq.heappush(self._expiry_heap, (mono_ts + self.signal_timeout, signal_id))
+        self._pending_signal_inserts[signal_id] = {
+            'id': signal_id, 'symbol': symbol, 'timeframe': timeframe,
+            'side': side, 'strength': strength, 'timestamp': timestamp, 'status': 'pending'
+        }
+        # OR REPLACE 写入会覆盖同ID的旧记录，之前排队的删除/状态更新不再需要
+        self._pending_signal_deletes.discard(signal_id)
+        self._pending_status_updates.pop(signal_id, None)
+        self._notify_signal_flush()
+
+    def _notify_signal_flush(self) -> None:
+        pending = (len(self._pending_signal_inserts) + len(self._pending_status_updates)
+                   + len(self._pending_signal_deletes))
+        if pending >= self.SIGNAL_FLUSH_BATCH:
+            self._signal_flush_event.set()
+
+    async def flush_signals(self) -> None:
+        """将缓冲区中的新增、状态更新和删除在一个事务中写入数据库"""
+        async with self._signal_db_lock:
+            if not (self._pending_signal_inserts or self._pending_status_updates or self._pending_signal_deletes):
+                return
+            rows = list(self._pending_signal_inserts.values())
+            updates = [
+                {'signal_id': signal_id, 'new_status': status}
+                for signal_id, status in self._pending_status_updates.items()
+            ]
+            deletes = [{'signal_id': signal_id} for signal_id in self._pending_signal_deletes]
+            self._pending_signal_inserts.clear()
+            self._pending_status_updates.clear()
+            self._pending_signal_deletes.clear()
+            try:
+                async with db_pool.get_session() as session:
+                    if rows:
+                        await session.execute(_UPSERT_SIGNALS, rows)
+                    if updates:
+                        await session.execute(_UPDATE_SIGNAL_STATUS, updates)
+                    if deletes:
+                        await session.execute(_DELETE_SIGNAL, deletes)
+                    await session.commit()
+            except OperationalError as e:
+                # 数据库被锁等临时错误：放回缓冲区，下一轮重试
+                self._signal_flush_failures += 1
+                if self._signal_flush_failures <= self.SIGNAL_FLUSH_MAX_RETRIES:
+                    logger.warning("批量写入信号失败 (第 %d 次)，下次重试: %s", self._signal_flush_failures, e)
+                    self._requeue_signal_writes(rows, updates, deletes)
+                    return
+                await self._drop_signal_writes(rows, updates, deletes, e)
+            except Exception as e:
+                # 约束冲突等永久性错误：重试只会让同一批次反复失败，丢弃并报警
+                await self._drop_signal_writes(rows, updates, deletes, e)
+            else:
+                self._signal_flush_failures = 0
+
+    async def _drop_signal_writes(self, rows: List[Dict[str, Any]], updates: List[Dict[str, Any]],
+                                  deletes: List[Dict[str, Any]], error: Exception) -> None:
+        self._signal_flush_failures = 0
+        summary = f"新增 {len(rows)}, 更新 {len(updates)}, 删除 {len(deletes)}"
+        logger.error(f"批量写入信号失败，已丢弃该批次 ({summary}): {error}", exc_info=True)
+        if self.alert_system:
+            await self.alert_system.trigger_alert(
+                alert_type="DATABASE_ERROR",
+                message=f"信号写入数据库失败，已丢弃 ({summary}): {error}",
+                level="error"
+            )
+
+    def _requeue_signal_writes(self, rows: List[Dict[str, Any]], updates: List[Dict[str, Any]],
+                               deletes: List[Dict[str, Any]]) -> None:
+        """写入失败的批次放回缓冲区；写入期间同一信号已有更新的操作时，以更新的为准"""
+        inserts = self._pending_signal_inserts
+        status_updates = self._pending_status_updates
+        pending_deletes = self._pending_signal_deletes
+        for row in rows:
+            signal_id = row['id']
+            if signal_id in inserts or signal_id in pending_deletes:
+                continue
+            # 写入期间的状态更新落在了独立缓冲区，合并回待插入的行
+            new_status = status_updates.pop(signal_id, None)
+            if new_status is not None:
+                row['status'] = new_status
+            inserts[signal_id] = row
+        for update in updates:
+            signal_id = update['signal_id']
+            if signal_id in inserts or signal_id in pending_deletes or signal_id in status_updates:
+                continue
+            status_updates[signal_id] = update['new_status']
+        for delete in deletes:
+            signal_id = delete['signal_id']
+            if signal_id not in inserts:
+                pending_deletes.add(signal_id)
+
+    async def _signal_flush_loop(self) -> None:
+        """后台批量写入任务：每 SIGNAL_FLUSH_INTERVAL 秒或缓冲区满时写入一次"""
+        while not self._signal_flush_closing:
+            try:
+                await asyncio.wait_for(self._signal_flush_event.wait(), timeout=self.SIGNAL_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._signal_flush_event.clear()
+            await self.flush_signals()
+
+    async def __aenter__(self) -> "TradingEngine":
+        """预加载市场信息后初始化，下单时无需再逐个解析交易对"""
+        if not self.exchange.markets:
+            await self.exchange.load_markets()
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        # 交易所实例由调用方创建并共享，这里只释放引擎自身的资源
+        await self.close()
+
+    async def close(self) -> None:
+        """停止后台任务并写入尚未落库的信号"""
+        if self._signal_flush_task:
+            # 不取消写入任务：缓冲区在写入前已清空，中途取消会丢失正在写入的批次
+            self._signal_flush_closing = True
+            self._signal_flush_event.set()
+            await self._signal_flush_task
+            self._signal_flush_task = None
+        if self._order_update_task:
+            self._order_update_task.cancel()
+            try:
+                await self._order_update_task
+            except asyncio.CancelledError:
+                pass
+            self._order_update_task = None
+            self._order_stream_healthy = False
+        if self._balance_stream_task:
+            self._balance_stream_task.cancel()
+            try:
+                await self._balance_stream_task
+            except asyncio.CancelledError:
+                pass
+            self._balance_stream_task = None
+            self._balance_stream_healthy = False
+        if self._price_streams:
+            streams = list(self._price_streams.values())
+            self._price_streams.clear()
+            for task in streams:
+                task.cancel()
+            await asyncio.gather(*streams, return_exceptions=True)
+        if self._monitor_tasks:
+            for task in self._monitor_tasks:
+                task.cancel()
+            await asyncio.gather(*self._monitor_tasks, return_exceptions=True)
+        await self.flush_signals()
 
     async def remove_signal(self, signal_id: str) -> None:
-        if signal_id in self.resonance_pool:
-            del self.resonance_pool[signal_id]
-        try:
-            async with db_pool.get_session() as session:
-                stmt = delete(ResonanceSignal).where(ResonanceSignal.id == signal_id)
-                await session.execute(stmt)
-                await session.commit()
-        except Exception as e:
-            logger.error(f"从数据库删除信号失败: {e}", exc_info=True)
+        removed = self.resonance_pool.pop(signal_id, None)
+        if removed is not None and removed['status'] == 'pending':
+            self._pending_count -= 1
+        # 尚未落库的信号从缓冲区丢弃；数据库中可能仍有同ID的旧记录，照常排队删除
+        self._pending_signal_inserts.pop(signal_id, None)
+        self._pending_status_updates.pop(signal_id, None)
+        self._pending_signal_deletes.add(signal_id)
+        self._notify_signal_flush()
 
     async def update_signal_status(self, signal_id: str, status: str) -> None:
-        if signal_id in self.resonance_pool:
-            self.resonance_pool[signal_id]['status'] = status
-        try:
-            async with db_pool.get_session() as session:
-                stmt = update(ResonanceSignal).where(ResonanceSignal.id == signal_id).values(status=status)
-                await session.execute(stmt)
-                await session.commit()
-        except Exception as e:
-            logger.error(f"更新数据库信号状态失败: {e}", exc_info=True)
+        signal_data = self.resonance_pool.get(signal_id)
+        if signal_data is not None:
+            self._pending_count += (status == 'pending') - (signal_data['status'] == 'pending')
+            signal_data['status'] = status
+        pending_row = self._pending_signal_inserts.get(signal_id)
+        if pending_row is not None:
+            pending_row['status'] = status
+            return
+        self._pending_status_updates[signal_id] = status
+        self._notify_signal_flush()
 
     async def _load_resonance_pool_from_db(self):
         try:
             async with db_pool.get_session() as session:
                 current_time = time.time()
-                stmt = select(ResonanceSignal).where(
+                current_mono = time.monotonic()
+                # 只查询需要的列并以映射形式返回，跳过 ORM 对象的构造
+                stmt = select(
+                    ResonanceSignal.id, ResonanceSignal.symbol, ResonanceSignal.timeframe,
+                    ResonanceSignal.side, ResonanceSignal.strength, ResonanceSignal.timestamp,
+                    ResonanceSignal.status
+                ).where(
                     ResonanceSignal.timestamp > (current_time - self.signal_timeout),
                     ResonanceSignal.status == 'pending'
-                )
+                ).order_by(ResonanceSignal.timestamp.desc()).limit(self.SIGNAL_LOAD_LIMIT)  # 超出上限时保留最新的信号
                 result = await session.execute(stmt)
-                signals = result.scalars().all()
-                for signal in signals:
-                    self.resonance_pool[signal.id] = {
-                        'symbol': signal.symbol, 'timeframe': signal.timeframe, 'side': signal.side,
-                        'strength': signal.strength, 'timestamp': signal.timestamp, 'status': signal.status
+                rows = result.mappings().all()
+                # 数据库中只有墙上时间，换算为对应的单调时钟时间
+                offset = current_mono - current_time
+                loaded = {
+                    row['id']: {
+                        'symbol': row['symbol'], 'timeframe': row['timeframe'], 'side': row['side'],
+                        'strength': row['strength'], 'timestamp': row['timestamp'],
+                        'mono_ts': row['timestamp'] + offset, 'status': row['status']
                     }
+                    for row in rows
+                }
+                self.resonance_pool.update(loaded)
+                self._pending_count = sum(1 for data in self.resonance_pool.values() if data['status'] == 'pending')
+                self._expiry_heap.extend(
+                    (data['mono_ts'] + self.signal_timeout, signal_id) for signal_id, data in loaded.items()
+                )
+                heapq.heapify(self._expiry_heap)
         except Exception as e:
             logger.error(f"从数据库加载共振池失败: {e}", exc_info=True)
             raise
 
     async def get_resonance_pool(self) -> Dict[str, Any]:
         current_time = time.time()
-        expired_signals = [
-            signal_id for signal_id, signal_data in self.resonance_pool.items()
-            if current_time - signal_data['timestamp'] > self.signal_timeout
-        ]
-        for signal_id in expired_signals:
-            await self.remove_signal(signal_id)
-        pending_signals = [
-            data for data in self.resonance_pool.values() if data['status'] == 'pending'
-        ]
+        current_mono = time.monotonic()
+        while self._expiry_heap and self._expiry_heap[0][0] < current_mono:
+            _, signal_id = heapq.heappop(self._expiry_heap)
+            signal_data = self.resonance_pool.get(signal_id)
+            if not signal_data:
+                continue  # 信号已被删除
+            # 信号被重新添加时 add_signal 已压入新的过期时间，旧条目直接丢弃
+            if current_mono > signal_data['mono_ts'] + self.signal_timeout:
+                await self.remove_signal(signal_id)
         return {
             'signals': self.resonance_pool,
             'count': len(self.resonance_pool),
-            'pending_count': len(pending_signals),
+            'pending_count': self._pending_count,
             'last_update': current_time
         }
@@ -1,10 +1,14 @@
 import csv
-from typing import List, Dict
+from typing import List, Dict, Iterator
+
+def iter_csv_rows(filepath: str) -> Iterator[Dict]:
+    """逐行读取CSV，内存占用与单行大小相当，适合大文件"""
+    with open(filepath, 'r', newline='') as f:
+        yield from csv.DictReader(f)
 
 def read_csv_to_dict(filepath: str) -> List[Dict]:
-    """轻量级CSV读取器替代pandas"""
-    with open(filepath, 'r') as f:
-        return list(csv.DictReader(f))
+    """轻量级CSV读取器替代pandas（一次性读入全部行，大文件请使用 iter_csv_rows）"""
+    return list(iter_csv_rows(filepath))
         
 def write_dict_to_csv(data: List[Dict], filepath: str):
     """轻量级CSV写入器替代pandas"""
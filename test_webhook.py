@@ -1,6 +1,5 @@
 import hmac
-import hashlib
-import json
+import orjson
 import httpx
 import asyncio
 import os
@@ -33,7 +32,8 @@ FACTOR_UPDATE_PAYLOAD = {
 
 def generate_signature(secret: str, payload: bytes) -> str:
     """生成HMAC-SHA256签名"""
-    return hmac.new(secret.encode('utf-8'), payload, hashlib.sha256).hexdigest()
+    # hmac.digest 走 OpenSSL 单次调用，无需构造 HMAC 对象
+    return hmac.digest(secret.encode('utf-8'), payload, 'sha256').hex()
 
 async def send_test_request(url: str, payload: dict):
     """发送一个带签名的测试请求"""
@@ -43,8 +43,8 @@ async def send_test_request(url: str, payload: dict):
 
     print(f"\n--- 准备发送测试请求至: {url} ---")
     
-    # 1. 将JSON数据转换为bytes
-    payload_bytes = json.dumps(payload).encode('utf-8')
+    # 1. 将JSON数据转换为bytes (orjson 直接输出 UTF-8 bytes；不加任何选项，保证签名输入稳定)
+    payload_bytes = orjson.dumps(payload)
     
     # 2. 生成签名
     signature = generate_signature(WEBHOOK_SECRET, payload_bytes)
@@ -1,24 +1,41 @@
 # src/validator.py
 import ast
 import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+def _parse_one(path: str) -> Tuple[str, Optional[SyntaxError]]:
+    """解析单个文件，返回 (路径, 语法错误或 None)"""
+    try:
+        # 直接传入 bytes，由 ast.parse 按源码声明的编码解码
+        with open(path, "rb") as f:
+            ast.parse(f.read(), filename=path)
+        return path, None
+    except SyntaxError as e:
+        return path, e
 
 def validate_python_files():
+    paths = [
+        os.path.join(root, file)
+        for root, _, files in os.walk("src")
+        for file in files
+        if file.endswith(".py")
+    ]
+    # 各文件相互独立，多进程并行解析
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(_parse_one, paths))
+
     error_count = 0
-    for root, _, files in os.walk("src"):
-        for file in files:
-            if file.endswith(".py"):
-                path = os.path.join(root, file)
-                try:
-                    with open(path, "r") as f:
-                        ast.parse(f.read())
-                    print(f"✅ {path} 语法验证通过")
-                except SyntaxError as e:
-                    error_count += 1
-                    print(f"❌ {path} 语法错误: {e}")
-    
+    for path, error in results:
+        if error is None:
+            print(f"✅ {path} 语法验证通过")
+        else:
+            error_count += 1
+            print(f"❌ {path} 语法错误: {error}")
+
     if error_count > 0:
         raise RuntimeError(f"发现 {error_count} 个语法错误，请修复后提交")
-    
+
     print("所有文件语法验证通过")
 
 if __name__ == "__main__":